@@ -27,7 +27,10 @@ For more information: https://gist.github.com/fnky/458719343aabd01cfb17a3a4f7296
 
 import re
 import sys
+import time
 import termios
+from reader import InputReader, get_reader
+from output import Output, get_output, stdout_fileno
 from errors import ReadCursorPositionError
 
 
@@ -121,9 +124,15 @@ SAVE_SCREEN = '\033[?47h'
 RESTORE_SCREEN = '\033[?47l'
 ENABLE_ALTERNATIVE_BUFFER = '\033[?1049h'
 DISABLE_ALTERNATIVE_BUFFER = '\033[?1049l'
+ENABLE_BRACKETED_PASTE = '\033[?2004h'
+DISABLE_BRACKETED_PASTE = '\033[?2004l'
 
 # Regex pattern
 ANSI_PATTERN = r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])'
+ANSI_REGEX = re.compile(ANSI_PATTERN)
+
+# An escape sequence that is not complete yet (at the end of a chunk)
+PARTIAL_ANSI_REGEX = re.compile(r'\x1B(?:\[[0-?]*[ -/]*)?')
 
 
 def remove_ansi_from_string(string: str) -> str:
@@ -138,7 +147,10 @@ def remove_ansi_from_string(string: str) -> str:
     if not isinstance(string, str):
         raise TypeError(f'The string argument must be of the string type, but received: "{type(string)}".')
 
-    return re.compile(ANSI_PATTERN).sub('', string)
+    if ESC not in string:
+        return string
+
+    return ANSI_REGEX.sub('', string)
 
 
 def extract_ansi_from_string(string: str) -> list[str]:
@@ -153,7 +165,29 @@ def extract_ansi_from_string(string: str) -> list[str]:
     if not isinstance(string, str):
         raise TypeError(f'The string argument must be of the string type, but received: "{type(string)}".')
 
-    return re.compile(ANSI_PATTERN).findall(string)
+    if ESC not in string:
+        return []
+
+    return ANSI_REGEX.findall(string)
+
+
+def subn_ansi(string: str) -> tuple[str, int]:
+    """
+    The task of this function is to remove ANSI codes from inside a string in a single pass
+    and count them at the same time (like re.subn).
+    This function will return a tuple of the cleared string and the number of removed ANSI codes.
+
+    :param string: A string containing ANSI codes.
+    :return: tuple[str, int]
+    """
+
+    if not isinstance(string, str):
+        raise TypeError(f'The string argument must be of the string type, but received: "{type(string)}".')
+
+    if ESC not in string:
+        return string, 0
+
+    return ANSI_REGEX.subn('', string)
 
 
 def extract_non_ansi(string: str) -> tuple[bool, str]:
@@ -166,39 +200,137 @@ def extract_non_ansi(string: str) -> tuple[bool, str]:
     :return: tuple[bool, str]
     """
 
-    if not isinstance(string, str):
-        raise TypeError(f'The string argument must be of the string type, but received: "{type(string)}".')
+    cleaned, count = subn_ansi(string)
+
+    return count > 0, cleaned
+
+
+class AnsiStripper:
+    """
+    A streaming remover of ANSI codes.
+    Chunks of a text are fed one by one, and an escape sequence that is split
+    between two chunks is kept until the rest of it arrives.
+    An unfinished sequence longer than MAX_PENDING characters is not an ANSI code,
+    so it is returned as text instead of being kept without a bound.
+    """
+
+    MAX_PENDING: int = 256
+
+    def __init__(self):
+        self._pending: str = ""
+
+    def feed(self, chunk: str) -> str:
+        """
+        The task of this method is to remove ANSI codes from the next chunk of the text.
+
+        :param chunk: The next chunk of the text.
+        :return: str (the cleaned text that is complete so far)
+        """
 
-    compiled_pattern = re.compile(ANSI_PATTERN)
+        if self._pending:
+            chunk = self._pending + chunk
+            self._pending = ""
 
-    if compiled_pattern.findall(string):
-        return True, compiled_pattern.sub('', string)
+        if ESC not in chunk:
+            return chunk
 
-    return False, string
+        last: int = chunk.rfind(ESC)
+
+        if len(chunk) - last <= self.MAX_PENDING and PARTIAL_ANSI_REGEX.fullmatch(chunk, last):
+            chunk, self._pending = chunk[:last], chunk[last:]
+
+        return ANSI_REGEX.sub('', chunk)
+
+    def flush(self) -> str:
+        """
+        The task of this method is to return the rest of the text at the end of the stream.
+        An incomplete escape sequence at the end of the stream is returned as it is.
+
+        :return: str
+        """
+
+        pending, self._pending = self._pending, ""
+        return pending
+
+
+def strip_ansi_stream(source, chunk_size: int=65536):
+    """
+    The task of this function is to remove ANSI codes from a stream of text.
+    The source can be a file-like object (with a read method) or an iterable of string chunks,
+    and escape sequences that are split between chunks are handled.
+
+    :param source: A file-like object or an iterable of strings.
+    :param chunk_size: The size of the chunks that are read from a file-like object.
+    :return: Iterator[str]
+    """
+
+    if hasattr(source, 'read'):
+        chunks = iter(lambda: source.read(chunk_size), '')
+    else:
+        chunks = source
+
+    stripper: AnsiStripper = AnsiStripper()
+
+    for chunk in chunks:
+        if not isinstance(chunk, str):
+            raise TypeError(f'The chunks of the stream must be of the string type, but received: "{type(chunk)}".')
+
+        cleaned: str = stripper.feed(chunk)
+
+        if cleaned:
+            yield cleaned
+
+    rest: str = stripper.flush()
+
+    if rest:
+        yield rest
+
+
+# Precomputed escape sequences of the render path
+FG_256_COLOR_CELLS: tuple = tuple(ESC + CSI + '38;5;' + str(code) + 'm' for code in range(256))
+BG_256_COLOR_CELLS: tuple = tuple(ESC + CSI + '48;5;' + str(code) + 'm' for code in range(256))
+
+# Column moves are built on demand and kept, so the table grows to the widest column that was used.
+COLUMN_MOVES: list = []
+
+_GRAPHIC_CELLS: dict = {}
+_CURSOR_MOVES: dict = {}
 
 
 def get_graphic_cell(*args) -> str:
     """
     The task of this function is to return an ANSI graphics cell
     according to the graphic arguments, in the form of a string.
+    Cells of integer codes are built once and then returned from a cache.
     For more information: https://gist.github.com/fnky/458719343aabd01cfb17a3a4f7296797#colors--graphics-mode
 
     :param args: ANSI graphic codes
     :return: str
     """
 
+    cell: str|None = _GRAPHIC_CELLS.get(args)
+
+    if cell is not None:
+        return cell
+
     try:
         graphic_codes: list = list(map(int, args))
     except ValueError:
         raise TypeError('All graphic codes must be int type or have the ability to convert to int.')
 
-    return ESC + CSI + ';'.join(map(lambda x: x.__str__(), graphic_codes)) + 'm'
+    cell = ESC + CSI + ';'.join(map(str, graphic_codes)) + 'm'
+
+    if all(type(code) is int for code in args):
+        _GRAPHIC_CELLS[args] = cell
+
+    return cell
 
 
 def get_256_color_cell(color_code: int, color_type: str) -> str:
     """
     The task of this function is to return a color graphic cell
     based on color codes between 0 and 255.
+    The cells are taken from the precomputed FG_256_COLOR_CELLS and BG_256_COLOR_CELLS tables.
     For more information: https://gist.github.com/fnky/458719343aabd01cfb17a3a4f7296797#256-colors
 
     :param color_code: A color code between 0 and 255.
@@ -206,6 +338,13 @@ def get_256_color_cell(color_code: int, color_type: str) -> str:
     :return: str
     """
 
+    if type(color_code) is int and 0 <= color_code <= 255:
+        if color_type == 'fg':
+            return FG_256_COLOR_CELLS[color_code]
+
+        if color_type == 'bg':
+            return BG_256_COLOR_CELLS[color_code]
+
     if not isinstance(color_code, int):
         raise TypeError(f'The type of the color_code argument must be a int, but received "{type(color_code)}".')
 
@@ -218,10 +357,7 @@ def get_256_color_cell(color_code: int, color_type: str) -> str:
     if color_type not in ('bg', 'fg',):
         raise ValueError(f'The value of the color_type argument must be between "bg" and "fg", but received: "{color_type}".')
 
-    if color_type == 'bg':
-        return ESC + CSI + '48;5;' + color_code.__str__() + 'm'
-
-    return ESC + CSI + '38;5;' + color_code.__str__() + 'm'
+    return (BG_256_COLOR_CELLS if color_type == 'bg' else FG_256_COLOR_CELLS)[color_code]
 
 
 def get_rgb_color_cell(r: int, g: int, b: int, color_type: str) -> str:
@@ -252,43 +388,155 @@ def get_rgb_color_cell(r: int, g: int, b: int, color_type: str) -> str:
         raise ValueError(f'The value of the color_type argument must be between "bg" and "fg", but received: "{color_type}".')
 
     if color_type == 'bg':
-        return ESC + CSI + '48;2;' + ';'.join(map(lambda x: x.__str__, [r, g, b])) + 'm'
+        return ESC + CSI + '48;2;' + ';'.join(map(str, [r, g, b])) + 'm'
 
-    return ESC + CSI + '38;2;' + ';'.join(map(lambda x: x.__str__, [r, g, b])) + 'm'
+    return ESC + CSI + '38;2;' + ';'.join(map(str, [r, g, b])) + 'm'
 
 
 def move_cursor(row: int, col: int) -> str:
     """
     The task of this function is to move the cursor to the desired coordinates.
     This function will return a string containing the ANSI code of the new cursor position.
+    The codes are built once for each position and then returned from a cache.
 
     :param row: The desired line to move the cursor to the point.
     :param col: The desired column to move the cursor to the point.
     :return: str
     """
 
+    code: str|None = _CURSOR_MOVES.get((row, col))
+
+    if code is not None and type(row) is int and type(col) is int:
+        return code
+
     if not isinstance(row, int):
         raise TypeError(f'The type of the "row" argument must be an integer, but received "{type(row)}"')
 
     if not isinstance(col, int):
         raise TypeError(f'The type of the "col" argument must be an integer, but received "{type(col)}"')
 
-    return ESC + CSI + row.__str__() + ';' + col.__str__() + 'H'
+    code = ESC + CSI + str(row) + ';' + str(col) + 'H'
+
+    if type(row) is int and type(col) is int:
+        _CURSOR_MOVES[(row, col)] = code
+
+    return code
 
 
 def move_cursor_to_column(col: int) -> str:
     """
     The task of this function is to move the cursor to the desired column.
     This function will return a string containing the ANSI code to move the cursor to the specified column.
+    The codes are kept in the COLUMN_MOVES table, which grows up to the widest requested column.
 
     :param col: The desired column to move the cursor to the point.
     :return: str
     """
 
+    if type(col) is int and 0 <= col < len(COLUMN_MOVES):
+        return COLUMN_MOVES[col]
+
     if not isinstance(col, int):
         raise TypeError(f'The type of the "col" argument must be an integer, but received "{type(col)}"')
 
-    return ESC + CSI + col.__str__() + 'G'
+    if type(col) is not int or col < 0:
+        return ESC + CSI + str(col) + 'G'
+
+    COLUMN_MOVES.extend(ESC + CSI + str(column) + 'G' for column in range(len(COLUMN_MOVES), col + 1))
+
+    return COLUMN_MOVES[col]
+
+
+class Style(str):
+    """
+    An immutable text style that combines graphics modes and colors.
+    The SGR code of the style is compiled once when it is constructed, and styles are
+    cached by value, so constructing the same style again returns the same object.
+
+    A Style is a string whose value is its SGR code, so it can be used everywhere
+    an ANSI code is expected (for example as a value of highlight_rules or in lexers).
+    Colors are either a 256-color code (0 to 255) or an (r, g, b) tuple.
+    """
+
+    _cache: dict = {}
+
+    def __new__(
+        cls,
+        *,
+        bold: bool=False,
+        faint: bool=False,
+        italic: bool=False,
+        underline: bool=False,
+        blink: bool=False,
+        inverse: bool=False,
+        fg: int|tuple[int, int, int]=None,
+        bg: int|tuple[int, int, int]=None,
+    ):
+        key: tuple = (bool(bold), bool(faint), bool(italic), bool(underline), bool(blink), bool(inverse), fg, bg)
+        style: Style|None = cls._cache.get(key)
+
+        if style is not None:
+            return style
+
+        codes: list = [
+            code for code, enabled in zip(('1', '2', '3', '4', '5', '7'), key[:6]) if enabled
+        ]
+
+        for color, base in ((fg, '38'), (bg, '48')):
+            if color is None:
+                continue
+
+            if isinstance(color, int) and 0 <= color <= 255:
+                codes.append(base + ';5;' + str(color))
+            elif isinstance(color, tuple) and len(color) == 3 and all(isinstance(c, int) and 0 <= c <= 255 for c in color):
+                codes.append(base + ';2;' + ';'.join(map(str, color)))
+            else:
+                raise ValueError(
+                    f'A color must be a code between 0 and 255 or an (r, g, b) tuple, but received: {color!r}.'
+                )
+
+        style = super().__new__(cls, ESC + CSI + ';'.join(codes) + 'm' if codes else '')
+        style.__dict__.update(zip(
+            ('bold', 'faint', 'italic', 'underline', 'blink', 'inverse', 'fg', 'bg'), key
+        ))
+        cls._cache[key] = style
+
+        return style
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{self.__class__.__name__} objects are immutable.')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{self.__class__.__name__} objects are immutable.')
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo: dict):
+        return self
+
+    def __reduce__(self):
+        return _restore_style, (self.__dict__.copy(),)
+
+    def apply(self, text: str) -> str:
+        """
+        The task of this method is to return a text in this style.
+
+        :param text: The text to be styled.
+        :return: str
+        """
+
+        return self + text + RESET if self else text
+
+    def __repr__(self) -> str:
+        fields: str = ', '.join(
+            f'{name}={value!r}' for name, value in self.__dict__.items() if value is not None and value is not False
+        )
+        return f'Style({fields})'
+
+
+def _restore_style(fields: dict) -> Style:
+    return Style(**fields)
 
 
 def move_cursor_up(lines: int) -> str:
@@ -381,37 +629,94 @@ def move_cursor_to_previous_line(lines_up: int) -> str:
     return ESC + CSI + lines_up.__str__() + 'F'
 
 
-def get_cursor_position() -> tuple[int, int]:
+CURSOR_POSITION_TIMEOUT: float = 1.0
+CURSOR_POSITION_REGEX = re.compile(r'\x1B\[(\d+);(\d+)R')
+
+
+def send_cursor_position_request(reader: InputReader) -> int:
+    """
+    The task of this function is to ask the terminal for the cursor position.
+    Everything that already arrived on the input was typed before the request, so it is read
+    into the reader first and only the input after it is searched for the reply.
+
+    :param reader: The reader of the terminal input.
+    :return: int (the number of buffered characters that were typed before the request)
+    """
+
+    output: Output = get_output(stdout_fileno())
+
+    while reader.fill(0):
+        pass
+
+    typed_before: int = reader.buffered()
+
+    output.write(REQUEST_CURSOR_POSITION)
+    output.flush()
+
+    return typed_before
+
+
+def take_cursor_position_reply(reader: InputReader, typed_before: int) -> tuple[int, int]|None:
+    """
+    The task of this function is to find the reply of the terminal to a cursor position request
+    and remove it from the reader. The keys around the reply stay in the reader for the key decoder.
+
+    :param reader: The reader of the terminal input.
+    :param typed_before: The result of send_cursor_position_request.
+    :return: tuple[int, int]|None (None if the reply has not arrived yet)
+    """
+
+    res = CURSOR_POSITION_REGEX.search(reader.peek(), typed_before)
+
+    if res is None:
+        return None
+
+    typed_ahead: str = reader.peek()
+    reader.consume(len(typed_ahead))
+    reader.unread(typed_ahead[:res.start()] + typed_ahead[res.end():])
+
+    return int(res.group(1)), int(res.group(2))
+
+
+def get_cursor_position(timeout: float=CURSOR_POSITION_TIMEOUT) -> tuple[int, int]:
     """
     The task of this function is to request the cursor position from the terminal
     by special ANSI escape code and read the position.
     The value that this function returns is a tuple consisting of row and column positions as an integer.
 
+    The reply is read through the shared input reader with a deadline, and keys that the user
+    typed before the reply arrived are kept in the reader for the key decoder (nothing is flushed).
+    Only the input that arrives after the request is searched for the reply, so a key that was
+    typed earlier with the same form (for example Ctrl+F3) is not taken for it.
+
+    This function blocks until the reply arrives, so inside an asyncio event loop
+    get_cursor_position_async (in keys) should be awaited instead.
+
+    :param timeout: The maximum waiting time for the reply of the terminal in seconds.
     :return: tuple[int, int]
     """
 
-    old_stdin_mode = termios.tcgetattr(sys.stdin)
-    _ = termios.tcgetattr(sys.stdin)
-    _[3] = _[3] & ~(termios.ECHO | termios.ICANON)
-    termios.tcsetattr(sys.stdin, termios.TCSAFLUSH, _)
+    reader: InputReader = get_reader(sys.stdin.fileno())
+    old_stdin_mode: list = termios.tcgetattr(reader.fd)
+
+    if old_stdin_mode[3] & (termios.ECHO | termios.ICANON):
+        _ = termios.tcgetattr(reader.fd)
+        _[3] = _[3] & ~(termios.ECHO | termios.ICANON)
+        termios.tcsetattr(reader.fd, termios.TCSANOW, _)
 
     try:
-        _ = ""
-        sys.stdout.write(REQUEST_CURSOR_POSITION)
-        sys.stdout.flush()
+        typed_before: int = send_cursor_position_request(reader)
+        deadline: float = time.monotonic() + timeout
 
-        while not (_ := _ + sys.stdin.read(1)).endswith('R'):
-            ...
-        res = re.match(r".*\[(?P<y>\d*);(?P<x>\d*)R", _)
-    finally:
-        termios.tcsetattr(sys.stdin, termios.TCSAFLUSH, old_stdin_mode)
+        while (position := take_cursor_position_reply(reader, typed_before)) is None:
+            remaining: float = deadline - time.monotonic()
 
-    try:
-        row, col = int(res.group("y")), int(res.group("x"))
-    except ValueError:
-        raise ReadCursorPositionError(
-            (f'The cursor position cannot be read or converted. '
-            'Obtained position: (row={res.group("y")}, col={res.group("x")})')
-        )
+            if remaining <= 0 or not reader.fill(remaining):
+                raise ReadCursorPositionError(
+                    f'The terminal did not report the cursor position within {timeout} seconds.'
+                )
+    finally:
+        if old_stdin_mode[3] & (termios.ECHO | termios.ICANON):
+            termios.tcsetattr(reader.fd, termios.TCSANOW, old_stdin_mode)
 
-    return row, col
\ No newline at end of file
+    return position
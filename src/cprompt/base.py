@@ -14,19 +14,41 @@ cprompt Github repository: https://github.com/mimseyedi/cprompt
 
 
 import os
+import re
 import sys
+import time
+import inspect
+import threading
 from typing import Callable
+from contextlib import contextmanager
 from abc import ABC, abstractmethod
 
+from keys import Paste, AsyncKeyReader, raw_mode, readkey
+from reader import InputReader, get_reader
+from output import Output, get_output, stdout_fileno
+from terminal import Terminal, get_terminal
 from ansi import (
+    NEW_LINE,
     TERMINAL_BELL,
+    ENABLE_BRACKETED_PASTE,
+    DISABLE_BRACKETED_PASTE,
     extract_non_ansi,
+    remove_ansi_from_string,
     get_cursor_position as gcp,
 )
+from buffer import TextBuffer, GapBuffer
+from width import WidthIndex, string_width, fit_width
+from grapheme import GraphemeIndex, grapheme_property, ZWJ, EXTEND
+from render import LineRenderer, parse_segments
+from highlight import WordHighlighter, PatternHighlighter
+from lexer import Lexer, LexerHighlighter
+from conditions import ConditionRunner, ConditionSnapshot, is_pure_condition
+from history import History
 from errors import (
     LimitError,
     FormattedTypeError,
     ConditionIsNotCallableError,
+    PromptTimeoutError,
 )
 
 
@@ -35,27 +57,51 @@ class BaseCprompt(ABC):
 
     """
 
+    _sessions: int = 0
+
     def __init__(
         self,
         message: str="",
         *,
         limit: int=None,
         conditions: tuple=None,
+        buffer: type[TextBuffer]=None,
     ):
-        self._text: str = ""
+        if buffer is None:
+            self._buffer: TextBuffer = GapBuffer()
+        else:
+            if isinstance(buffer, type) and issubclass(buffer, TextBuffer):
+                self._buffer: TextBuffer = buffer()
+            else:
+                raise TypeError(
+                    ('The buffer attribute must be a subclass of TextBuffer, '
+                     f'but received "{buffer}".')
+                )
+
+        self._text_dirty: bool = True
+        self._cursor_dirty: bool = True
+        self._condition_memo: dict = {}
         self._cursor: int = 0
+        self._clusters: GraphemeIndex = GraphemeIndex()
+        self._widths: WidthIndex = WidthIndex(self._clusters)
         self._formatted: dict = {}
+        self._highlight_rules: dict = {}
+        self._lexer: Lexer|None = None
+        self._highlighter: WordHighlighter|PatternHighlighter|LexerHighlighter = WordHighlighter(self._formatted)
         self._last_key: str = ""
         self._ignored_keys: list = []
         self._returned_value: str|None = None
-
-        if isinstance(message, str):
-            self.message = message
-        else:
-            raise TypeError(
-                ('The message attribute must be of string type, '
-                 f'but received "{type(message)}".')
-            )
+        self._renderer: LineRenderer = LineRenderer()
+        self._drawn: tuple|None = None
+        self._frame_interval: float = 0.0
+        self._version: int = 0
+        self._condition_threads: int = 0
+        self._condition_debounce: float = 0.0
+        self._history: History|None = None
+        self._history_index: int|None = None
+        self._history_draft: str = ""
+
+        self.message = message
 
         if conditions is None:
             self.conditions = tuple()
@@ -74,13 +120,15 @@ class BaseCprompt(ABC):
                      f'but received "{type(conditions)}".')
                 )
 
-        termcol, _ = os.get_terminal_size()
+        termcol: int = self._terminal.columns
 
         if limit is None:
             self.limit = termcol
+            self._requested_limit: int|None = None
         else:
             if isinstance(limit, int) and limit <= termcol:
                 self.limit = limit
+                self._requested_limit: int|None = limit
             else:
                 raise LimitError(
                     ('The limit attribute must be of int type and '
@@ -88,6 +136,82 @@ class BaseCprompt(ABC):
                      f'limit={limit}, terminal width={termcol}')
                 )
 
+    def _splice(self, start: int, end: int, text: str="") -> None:
+        """
+        The task of this method is to replace a part of the user's input string with a new text.
+        All the edits of the input go through this method, so that the structures that follow
+        the input (like the highlighter) are updated only around the edited region.
+
+        :param start: The start index of the replaced part.
+        :param end: The end index of the replaced part (exclusive).
+        :param text: The new text.
+        :return: None
+        """
+
+        self._buffer.delete(start, end)
+        self._buffer.insert(start, text)
+        self._version += 1
+        self._text_dirty = True
+        self._clusters.edit(self._buffer, start, end, len(text))
+        self._widths.edit(self._buffer, start, end, len(text))
+        self._highlighter.edit(self._buffer, start, end, len(text))
+
+    def _update_highlighter(self) -> None:
+        """
+        The task of this method is to prepare the highlighter after the formatted data or the rules change.
+        Single words are highlighted incrementally by the WordHighlighter, and multi-word phrases or
+        regex rules are compiled into one matcher by the PatternHighlighter.
+        If a lexer is set, the input is highlighted by the lexer instead.
+
+        :return: None
+        """
+
+        if self._lexer is not None:
+            if isinstance(self._highlighter, LexerHighlighter) and self._highlighter.lexer is self._lexer:
+                return
+
+            self._highlighter = LexerHighlighter(self._lexer)
+
+        elif self._highlight_rules or any(' ' in key for key in self._formatted):
+            if isinstance(self._highlighter, PatternHighlighter) and not self._highlight_rules:
+                self._highlighter.set_formatted(self._formatted)
+                self._text_dirty = True
+                return
+
+            self._highlighter = PatternHighlighter(self._formatted, self._highlight_rules)
+        else:
+            if isinstance(self._highlighter, WordHighlighter):
+                self._highlighter.set_formatted(self._formatted)
+                self._text_dirty = True
+                return
+
+            self._highlighter = WordHighlighter(self._formatted)
+
+        self._highlighter.reset(self._text)
+        self._text_dirty = True
+
+    def _format(self) -> str:
+        """
+        The task of this method is to return the user's input string with its formatted words.
+
+        :return: str
+        """
+
+        return self._highlighter.render()
+
+    def _styled(self) -> str|list[tuple[str, str]]:
+        """
+        The task of this method is to return the highlighted user's input string for the renderer.
+        A lexer provides style spans directly, otherwise the formatted string is returned.
+
+        :return: str|list[tuple[str, str]]
+        """
+
+        if isinstance(self._highlighter, LexerHighlighter):
+            return self._highlighter.segments()
+
+        return self._highlighter.render()
+
     def _write(self, char: str) -> None:
         """
         The task of this method is to write a character in the user's input string.
@@ -100,15 +224,7 @@ class BaseCprompt(ABC):
 
         if isinstance(char, str):
             if len(char) == 1:
-                if self._text:
-                    if len(self._text) + len(self.message) + 1 < self.limit:
-                        self._text = self._text[0:self._cursor] + char + self._text[self._cursor:]
-                        self._cursor += 1
-                    else:
-                        sys.stdout.write(TERMINAL_BELL)
-                else:
-                    self._text += char
-                    self._cursor += 1
+                self._write_run(char)
             else:
                 raise ValueError(
                     f'The length of the char argument should be 1, but received {len(char)}.'
@@ -118,6 +234,33 @@ class BaseCprompt(ABC):
                 f'The type of char argument must be string, but received "{type(char)}".'
             )
 
+    def _write_run(self, run: str) -> None:
+        """
+        The task of this method is to write a run of characters in the user's input string
+        with a single splice. The write limit is checked once for the whole run in terminal columns
+        (wide characters take two columns), the run is truncated to the remaining room and
+        the terminal bell rings at most once.
+
+        :param run: A string without ANSI escape codes.
+        :return: None
+        """
+
+        if not run:
+            return
+
+        max_width: int = max(self.limit - self._message_width - 1, 1)
+        room: int = max(max_width - self._widths.width, 0)
+
+        allowed: str = fit_width(run, room)
+        truncated: bool = len(allowed) < len(run)
+
+        if allowed:
+            self._splice(self._cursor, self._cursor, allowed)
+            self._cursor += len(allowed)
+
+        if truncated:
+            self._ring_bell()
+
     def insert_text(self, text: str) -> None:
         """
         The task of this method is to insert a text in the user's input string.
@@ -132,14 +275,11 @@ class BaseCprompt(ABC):
             if len(text) <= self.limit:
                 status, string_ = extract_non_ansi(text)
 
-                if status:
-                    for char in string_:
-                        self._write(char)
+                self._write_run(string_)
 
+                if status:
                     self._formatted[string_] = text
-                else:
-                    for char in text:
-                        self._write(char)
+                    self._update_highlighter()
             else:
                 raise LimitError(
                     ('The text length is greater than limit. '
@@ -150,24 +290,51 @@ class BaseCprompt(ABC):
                 f'The type of text argument must be string, but received "{type(text)}".'
             )
 
+    def paste(self, text: str) -> None:
+        """
+        The task of this method is to insert a pasted text in the user's input string.
+        Line breaks and tabs are replaced with spaces and other control characters are dropped
+        (the joiners of grapheme clusters are kept),
+        then the whole text goes through the bulk insert with a single limit check.
+
+        :param text: The pasted text.
+        :return: None
+        """
+
+        if not isinstance(text, str):
+            raise TypeError(
+                f'The type of text argument must be string, but received "{type(text)}".'
+            )
+
+        _, string_ = extract_non_ansi(text.replace('\r\n', ' '))
+        self._write_run(
+            ''.join(
+                char if char.isprintable() or grapheme_property(char) in (ZWJ, EXTEND)
+                else ' ' if char in '\r\n\t' else ''
+                for char in string_
+            )
+        )
+
     def remove(self) -> None:
         """
         The task of this method is to delete a character from the location of the cursor.
         This function pushes the cursor back and deletes one character from the written input.
+        (Here character means a grapheme cluster, like a letter with its accents or an emoji sequence)
 
         :return: None
         """
 
         if self._cursor > 0:
-            self._cursor -= 1
-            self._text = self._text[:self._cursor] + self._text[self._cursor + 1:]
+            end: int = self._cursor
+            self._cursor = self._clusters.previous(end)
+            self._splice(self._cursor, end)
         else:
-            sys.stdout.write(TERMINAL_BELL)
+            self._ring_bell()
 
     def move_cursor_right(self) -> None:
         """
         The task of this method is to move the cursor one unit to the 'right'.
-        (Here unit means one column in the terminal which is equivalent to one character)
+        (Here unit means one character as the user sees it, which is a grapheme cluster)
 
         With the help of this method and relating it to a key, you can easily move
         to the 'right' among the user's input strings.
@@ -175,15 +342,15 @@ class BaseCprompt(ABC):
         :return: None
         """
 
-        if self._cursor < len(self._text):
-            self._cursor += 1
+        if self._cursor < len(self._buffer):
+            self._cursor = self._clusters.next(self._cursor)
         else:
-            sys.stdout.write(TERMINAL_BELL)
+            self._ring_bell()
 
     def move_cursor_left(self) -> None:
         """
         The task of this method is to move the cursor one unit to the 'left'.
-        (Here unit means one column in the terminal which is equivalent to one character)
+        (Here unit means one character as the user sees it, which is a grapheme cluster)
 
         With the help of this method and relating it to a key, you can easily move
         to the 'left' among the user's input strings.
@@ -192,9 +359,74 @@ class BaseCprompt(ABC):
         """
 
         if self._cursor > 0:
-            self._cursor -= 1
+            self._cursor = self._clusters.previous(self._cursor)
         else:
-            sys.stdout.write(TERMINAL_BELL)
+            self._ring_bell()
+
+    def _recall(self, text: str) -> None:
+        """
+        The task of this method is to replace the user's input string with a recalled text
+        (cut to the write limit) and to put the cursor at its end.
+
+        :param text: The recalled text.
+        :return: None
+        """
+
+        self._text = fit_width(text, max(self.limit - self._message_width - 1, 1))
+        self._cursor = len(self._buffer)
+
+    def history_previous(self) -> None:
+        """
+        The task of this method is to replace the user's input with the previous entry of the history.
+        The text that was being written before the history was entered is kept and comes back
+        after the last entry. If there is no previous entry, the terminal bell rings.
+
+        :return: None
+        """
+
+        if self._history is None:
+            self._ring_bell()
+            return
+
+        self._history.refresh()
+
+        if self._history_index is None:
+            index: int = len(self._history)
+        else:
+            index: int = min(self._history_index, len(self._history))
+
+        if index == 0:
+            self._ring_bell()
+            return
+
+        if self._history_index is None:
+            self._history_draft = self._text
+
+        self._history_index = index - 1
+        self._recall(self._history[index - 1])
+
+    def history_next(self) -> None:
+        """
+        The task of this method is to replace the user's input with the next entry of the history,
+        or with the text that was being written before the history was entered.
+        If the input is not an entry of the history, the terminal bell rings.
+
+        :return: None
+        """
+
+        if self._history is None or self._history_index is None:
+            self._ring_bell()
+            return
+
+        self._history.refresh()
+        index: int = self._history_index + 1
+
+        if index < len(self._history):
+            self._history_index = index
+            self._recall(self._history[index])
+        else:
+            self._history_index = None
+            self._recall(self._history_draft)
 
     def get_word_before_cursor(self) -> str:
         """
@@ -204,7 +436,7 @@ class BaseCprompt(ABC):
         :return: str
         """
 
-        splitted_text: list = self._text[:self._cursor].split()
+        splitted_text: list = self._buffer.slice(0, self._cursor).split()
         return splitted_text[-1] if splitted_text else ''
 
     def get_word_after_cursor(self) -> str:
@@ -215,7 +447,7 @@ class BaseCprompt(ABC):
         :return: str
         """
 
-        splitted_text: list = self._text[self._cursor:].split()
+        splitted_text: list = self._buffer.slice(self._cursor, len(self._buffer)).split()
         return splitted_text[0] if splitted_text else ''
 
     def get_text_before_cursor(self) -> str:
@@ -226,7 +458,7 @@ class BaseCprompt(ABC):
         :return: str
         """
 
-        return self._text[:self._cursor]
+        return self._buffer.slice(0, self._cursor)
 
     def get_text_after_cursor(self) -> str:
         """
@@ -236,7 +468,38 @@ class BaseCprompt(ABC):
         :return: str
         """
 
-        return self._text[self._cursor:]
+        return self._buffer.slice(self._cursor, len(self._buffer))
+
+    def delete_range(self, start: int, end: int) -> None:
+        """
+        The task of this method is to delete the text between two indexes with a single splice.
+        The range is clamped to the input string and the cursor is moved only once:
+        if it was inside the range it goes to the start, and if it was after the range it is shifted back.
+        If there is nothing to delete, the terminal bell rings once.
+
+        :param start: The start index of the deleted part.
+        :param end: The end index of the deleted part (exclusive).
+        :return: None
+        """
+
+        if not isinstance(start, int) or not isinstance(end, int):
+            raise TypeError(
+                ('The type of start and end arguments must be integer, '
+                 f'but received start="{type(start)}", end="{type(end)}".')
+            )
+
+        start, end = max(start, 0), min(end, len(self._buffer))
+
+        if start >= end:
+            self._ring_bell()
+            return
+
+        self._splice(start, end)
+
+        if self._cursor >= end:
+            self._cursor -= end - start
+        elif self._cursor > start:
+            self._cursor = start
 
     def del_word_before_cursor(self) -> None:
         """
@@ -248,8 +511,7 @@ class BaseCprompt(ABC):
         :return: None
         """
 
-        for _ in range(len(self.get_word_before_cursor()) + 1):
-            self.remove()
+        self.delete_range(self._cursor - len(self.get_word_before_cursor()) - 1, self._cursor)
 
     def remove_word_after_cursor(self) -> None:
         """
@@ -261,12 +523,7 @@ class BaseCprompt(ABC):
         :return: None
         """
 
-        len_of_word_after_cursor: int = len(self.get_word_after_cursor()) + 1
-
-        self._cursor += len_of_word_after_cursor
-
-        for _ in range(len_of_word_after_cursor):
-            self.remove()
+        self.delete_range(self._cursor, self._cursor + len(self.get_word_after_cursor()) + 1)
 
     def remove_text_before_cursor(self) -> None:
         """
@@ -278,8 +535,7 @@ class BaseCprompt(ABC):
         :return: None
         """
 
-        for _ in range(len(self.get_text_before_cursor())):
-            self.remove()
+        self.delete_range(0, self._cursor)
 
     def remove_text_after_cursor(self) -> None:
         """
@@ -291,12 +547,7 @@ class BaseCprompt(ABC):
         :return: None
         """
 
-        len_of_text_after_cursor: int = len(self.get_text_after_cursor()) + 1
-
-        self._cursor += len_of_text_after_cursor
-
-        for _ in range(len_of_text_after_cursor):
-            self.remove()
+        self.delete_range(self._cursor, len(self._buffer))
 
     @staticmethod
     def get_cursor_position() -> tuple[int, int]:
@@ -311,6 +562,85 @@ class BaseCprompt(ABC):
 
         return gcp()
 
+    @property
+    def _text(self) -> str:
+        return self._buffer.__str__()
+
+    @_text.setter
+    def _text(self, text_: str) -> None:
+        self._buffer.clear()
+        self._buffer.insert(0, text_)
+        self._version += 1
+        self._text_dirty = True
+        self._clusters.reset(text_)
+        self._widths.reset(text_)
+        self._highlighter.reset(text_)
+
+    @property
+    def _cursor(self) -> int:
+        return self._cursor_index
+
+    @_cursor.setter
+    def _cursor(self, cursor_: int) -> None:
+        if cursor_ != self.__dict__.get('_cursor_index'):
+            self._cursor_index = cursor_
+            self._cursor_dirty = True
+
+    @property
+    def _output(self) -> Output:
+        return get_output(stdout_fileno())
+
+    @property
+    def _terminal(self) -> Terminal:
+        return get_terminal(stdout_fileno())
+
+    def _ring_bell(self) -> None:
+        """
+        The task of this method is to ring the bell of the terminal.
+        During a prompt the bell is sent with the next frame, but outside of a prompt
+        (for example when an editing method is called directly) nothing else would flush it,
+        so it is written to sys.stdout at once.
+
+        :return: None
+        """
+
+        if BaseCprompt._sessions:
+            self._output.write(TERMINAL_BELL)
+        else:
+            sys.stdout.write(TERMINAL_BELL)
+            sys.stdout.flush()
+
+    @property
+    def message(self) -> str:
+        """
+        A getter method to get the message of the prompt.
+        The visible width of the message is measured once when it is set.
+
+        :return: str
+        """
+
+        return self._message
+
+    @message.setter
+    def message(self, message_: str) -> None:
+        """
+        A setter method to change the message of the prompt.
+        The value of the 'message_' argument must be of string type and may contain ANSI codes.
+
+        :param message_: The new message.
+        :return: None
+        """
+
+        if isinstance(message_, str):
+            self._message = message_
+            self._message_width = string_width(remove_ansi_from_string(message_))
+            self._text_dirty = True
+        else:
+            raise TypeError(
+                ('The message attribute must be of string type, '
+                 f'but received "{type(message_)}".')
+            )
+
     @property
     def text(self) -> str:
         """
@@ -377,6 +707,62 @@ class BaseCprompt(ABC):
 
         return self._ignored_keys
 
+    @property
+    def frame_interval(self) -> float:
+        """
+        A getter method to get the minimum time between two frames in seconds.
+        Keys that arrive within this time after a frame are applied without drawing a new frame.
+
+        :return: float
+        """
+
+        return self._frame_interval
+
+    @property
+    def history(self) -> History|None:
+        """
+        A getter method to get the command history of the prompt.
+        This method returns None if the prompt has no history.
+
+        :return: History|None
+        """
+
+        return self._history
+
+    @property
+    def version(self) -> int:
+        """
+        A getter method to get the edit version of the user's input string.
+        The version grows by one with every edit of the input, so it can be compared
+        to find out if the input has changed.
+
+        :return: int
+        """
+
+        return self._version
+
+    @property
+    def condition_threads(self) -> int:
+        """
+        A getter method to get the number of threads that run the conditions in the background.
+        Zero means that the conditions run in the key loop before each key is applied.
+
+        :return: int
+        """
+
+        return self._condition_threads
+
+    @property
+    def condition_debounce(self) -> float:
+        """
+        A getter method to get the quiet time (in seconds) that background conditions wait for
+        after a key before they run.
+
+        :return: float
+        """
+
+        return self._condition_debounce
+
     @cursor.setter
     def cursor(self, cursor_: int) -> None:
         """
@@ -401,6 +787,28 @@ class BaseCprompt(ABC):
                  'but received "{type(cursor_)}".')
             )
 
+    @property
+    def highlight_rules(self) -> dict:
+        """
+        A getter method to get the regex rules of highlighting.
+        This method returns the rules in the form of a dictionary of regex patterns and ANSI styles.
+
+        :return: dict
+        """
+
+        return self._highlight_rules.copy()
+
+    @property
+    def lexer(self) -> Lexer|None:
+        """
+        A getter method to get the lexer that highlights the user's input.
+        This method returns None if the input is highlighted with the formatted data.
+
+        :return: Lexer|None
+        """
+
+        return self._lexer
+
     @formatted.setter
     def formatted(self, formatted_: dict) -> None:
         """
@@ -420,12 +828,58 @@ class BaseCprompt(ABC):
                     )
 
             self._formatted = formatted_.copy()
+            self._update_highlighter()
         else:
             raise TypeError(
                 ('The type of formatted_ argument must be dictionary, '
                  f'but received "{type(formatted_)}".')
             )
 
+    @highlight_rules.setter
+    def highlight_rules(self, highlight_rules_: dict) -> None:
+        """
+        A setter method to change the regex rules of highlighting.
+        Each key of the 'highlight_rules_' argument is a regex pattern (a string or a compiled pattern)
+        and each value is the ANSI style that is applied to the matched text.
+
+        :param highlight_rules_: The new rules in dictionary type.
+        :return: None
+        """
+
+        if isinstance(highlight_rules_, dict):
+            for key, value in highlight_rules_.items():
+                if not isinstance(key, (str, re.Pattern)) or not isinstance(value, str):
+                    raise FormattedTypeError(
+                        ('The type of key must be string or a compiled pattern and the type of value must be string, '
+                         f'but received key="{type(key)}", value="{type(value)}".')
+                    )
+
+            self._highlight_rules = highlight_rules_.copy()
+            self._update_highlighter()
+        else:
+            raise TypeError(
+                ('The type of highlight_rules_ argument must be dictionary, '
+                 f'but received "{type(highlight_rules_)}".')
+            )
+
+    @lexer.setter
+    def lexer(self, lexer_: Lexer|None) -> None:
+        """
+        A setter method to change the lexer that highlights the user's input.
+        The value of the 'lexer_' argument must be a Lexer object or None.
+
+        :param lexer_: The new lexer (None to highlight with the formatted data).
+        :return: None
+        """
+
+        if lexer_ is None or isinstance(lexer_, Lexer):
+            self._lexer = lexer_
+            self._update_highlighter()
+        else:
+            raise TypeError(
+                f'The type of lexer_ argument must be Lexer, but received "{type(lexer_)}".'
+            )
+
     @ignored_keys.setter
     def ignored_keys(self, ignored_keys_: list) -> None:
         """
@@ -438,6 +892,94 @@ class BaseCprompt(ABC):
 
         self._ignored_keys = ignored_keys_.copy()
 
+    @frame_interval.setter
+    def frame_interval(self, frame_interval_: float) -> None:
+        """
+        A setter method to change the minimum time between two frames.
+        The value of the 'frame_interval_' argument must be a non-negative number of seconds.
+
+        :param frame_interval_: The new minimum frame interval in seconds.
+        :return: None
+        """
+
+        if isinstance(frame_interval_, (int, float)) and not isinstance(frame_interval_, bool):
+            if frame_interval_ >= 0:
+                self._frame_interval = float(frame_interval_)
+            else:
+                raise ValueError(
+                    f'The frame interval must not be negative, but received {frame_interval_}.'
+                )
+        else:
+            raise TypeError(
+                ('The type of frame_interval_ argument must be int or float, '
+                 f'but received "{type(frame_interval_)}".')
+            )
+
+    @history.setter
+    def history(self, history_: History|None) -> None:
+        """
+        A setter method to change the command history of the prompt.
+        With a history, UP and DOWN walk through its entries and the input is added to it on ENTER.
+
+        :param history_: A History object or None.
+        :return: None
+        """
+
+        if history_ is None or isinstance(history_, History):
+            self._history = history_
+            self._history_index = None
+        else:
+            raise TypeError(
+                f'The type of history_ argument must be History, but received "{type(history_)}".'
+            )
+
+    @condition_threads.setter
+    def condition_threads(self, condition_threads_: int) -> None:
+        """
+        A setter method to change the number of threads that run the conditions in the background.
+        In the background, the conditions receive a read-only snapshot of the prompt after each key
+        (a ConditionSnapshot) instead of the prompt itself, so they must not edit or draw the prompt.
+
+        :param condition_threads_: The new number of threads (0 to run the conditions in the key loop).
+        :return: None
+        """
+
+        if isinstance(condition_threads_, int) and not isinstance(condition_threads_, bool):
+            if condition_threads_ >= 0:
+                self._condition_threads = condition_threads_
+            else:
+                raise ValueError(
+                    f'The number of condition threads must not be negative, but received {condition_threads_}.'
+                )
+        else:
+            raise TypeError(
+                ('The type of condition_threads_ argument must be integer, '
+                 f'but received "{type(condition_threads_)}".')
+            )
+
+    @condition_debounce.setter
+    def condition_debounce(self, condition_debounce_: float) -> None:
+        """
+        A setter method to change the quiet time of background conditions.
+        The value of the 'condition_debounce_' argument must be a non-negative number of seconds.
+
+        :param condition_debounce_: The new quiet time in seconds.
+        :return: None
+        """
+
+        if isinstance(condition_debounce_, (int, float)) and not isinstance(condition_debounce_, bool):
+            if condition_debounce_ >= 0:
+                self._condition_debounce = float(condition_debounce_)
+            else:
+                raise ValueError(
+                    f'The condition debounce must not be negative, but received {condition_debounce_}.'
+                )
+        else:
+            raise TypeError(
+                ('The type of condition_debounce_ argument must be int or float, '
+                 f'but received "{type(condition_debounce_)}".')
+            )
+
     def clear(self) -> None:
         """
         The task of this method is to delete the input entered by the user.
@@ -446,9 +988,679 @@ class BaseCprompt(ABC):
         :return: None
         """
 
-        self._text = ""
+        self._buffer.clear()
+        self._version += 1
+        self._text_dirty = True
+        self._clusters.reset()
+        self._widths.reset()
+        self._highlighter.reset()
         self._cursor = 0
 
+    def _recall_condition(self, func: Callable, state: tuple) -> bool|None:
+        """
+        The task of this method is to reuse the last result of a pure condition (see pure_condition)
+        if the edit version and the last key are the same as in its last run.
+
+        :param func: A condition.
+        :param state: The current edit version and last key.
+        :return: bool|None (the exit status of the reused result, None if the condition must run)
+        """
+
+        if is_pure_condition(func):
+            memo: tuple|None = self._condition_memo.get(func)
+
+            if memo is not None and memo[0] == state:
+                self._returned_value = memo[1]
+                return memo[2]
+
+        return None
+
+    def _check_conditions(self, conditions: tuple) -> bool:
+        """
+        The task of this method is to run the conditions of the prompt for the last key.
+        The value returned by each condition is stored in the returned_value attribute.
+        A pure condition (see pure_condition) is not run again while the edit version
+        and the last key are the same as in its last run; its last result is reused.
+
+        :param conditions: Conditions to be checked in the format of a tuple.
+        :return: bool (True if a condition asked the prompt to exit)
+        """
+
+        exit_status: bool = False
+        state: tuple = (self._version, self._last_key)
+
+        for func in conditions:
+            exited: bool|None = self._recall_condition(func, state)
+
+            if exited is None:
+                exited = False
+
+                try:
+                    self._returned_value = func(self)
+                except SystemExit:
+                    exited = True
+                except TypeError:
+                    raise Exception
+
+                if is_pure_condition(func):
+                    self._condition_memo[func] = (state, self._returned_value, exited)
+
+            exit_status = exit_status or exited
+
+        return exit_status
+
+    async def _check_conditions_async(self, conditions: tuple) -> bool:
+        """
+        The task of this method is to run the conditions of the prompt for the last key in an event loop.
+        It works like _check_conditions, and a condition can also be a coroutine function
+        (or return an awaitable), which is awaited without blocking the event loop.
+
+        :param conditions: Conditions to be checked in the format of a tuple.
+        :return: bool (True if a condition asked the prompt to exit)
+        """
+
+        exit_status: bool = False
+        state: tuple = (self._version, self._last_key)
+
+        for func in conditions:
+            exited: bool|None = self._recall_condition(func, state)
+
+            if exited is None:
+                exited = False
+
+                try:
+                    value = func(self)
+
+                    if inspect.isawaitable(value):
+                        value = await value
+
+                    self._returned_value = value
+                except SystemExit:
+                    exited = True
+                except TypeError:
+                    raise Exception
+
+                if is_pure_condition(func):
+                    self._condition_memo[func] = (state, self._returned_value, exited)
+
+            exit_status = exit_status or exited
+
+        return exit_status
+
+    def _apply_condition_results(self, runner: ConditionRunner) -> bool:
+        """
+        The task of this method is to apply the results of the conditions that ran in the background.
+        A result is ignored if a newer key was submitted or the input was edited after its snapshot.
+        An exception raised by a condition is raised again in the key loop.
+
+        :param runner: The runner of the background conditions.
+        :return: bool (True if a condition asked the prompt to exit)
+        """
+
+        for result in runner.results():
+            if result.ticket != runner.ticket or result.version != self._version:
+                continue
+
+            if result.error is not None:
+                raise result.error
+
+            self._returned_value = result.returned_value
+
+            if result.exit_status:
+                return True
+
+        return False
+
+    def _handle_key(self, key: str) -> bool:
+        """
+        The task of this method is to apply a key that is read from the keyboard to the user's input.
+
+        :param key: The name of the key or the character that is read by readkey.
+        :return: bool (True if the key is ENTER and the input is finished)
+        """
+
+        if isinstance(key, Paste):
+            if 'PASTE' not in self.ignored_keys:
+                self.paste(key)
+
+            return False
+
+        if key in self.ignored_keys:
+            return False
+
+        match key:
+            case 'ENTER':
+                if self._history is not None:
+                    self._history.append(self._text)
+                    self._history_index = None
+
+                self._accept()
+                return True
+
+            case 'UP' if self._history is not None:
+                self.history_previous()
+
+            case 'DOWN' if self._history is not None:
+                self.history_next()
+
+            case 'BACKSPACE':
+                self.remove()
+
+            case 'RIGHT':
+                self.move_cursor_right()
+
+            case 'LEFT':
+                self.move_cursor_left()
+
+            case 'SPACE':
+                self._write(" ")
+
+            case _:
+                if key is not None and len(key) == 1 and (
+                    key.isprintable() or grapheme_property(key) in (ZWJ, EXTEND)
+                ):
+                    self._write(key)
+
+        return False
+
+    def _accept(self) -> None:
+        """
+        The task of this method is to finish the prompt when the user presses ENTER.
+
+        :return: None
+        """
+
+        self._display()
+        self._output.write(NEW_LINE)
+
+    def _begin(self) -> None:
+        """
+        The task of this method is to prepare the terminal screen before the first frame of a prompt.
+
+        :return: None
+        """
+
+    def _end(self) -> None:
+        """
+        The task of this method is to restore the terminal screen after the last frame of a prompt.
+
+        :return: None
+        """
+
+    async def _begin_async(self) -> None:
+        """
+        The task of this method is to do the work of _begin that waits for the terminal
+        without blocking the event loop. It is awaited by _run_async before the session starts.
+
+        :return: None
+        """
+
+    def _render(self, message: str, text: str|list[tuple[str, str]]=None, cursor: int=None) -> None:
+        """
+        The task of this method is to draw the prompt line with the help of the differential renderer.
+        Only the changes since the last frame are added to the output backend.
+        Without a text, the highlighted user's input is drawn, and if only a part of it has changed
+        since the last frame, only that part is rendered and drawn (see _patch).
+
+        :param message: The message of the prompt (may contain ANSI codes).
+        :param text: The formatted text that is displayed after the message, or its style spans
+                     (the highlighted user's input by default).
+        :param cursor: The column of the cursor in the text (the column of the cursor attribute by default).
+        :return: None
+        """
+
+        if cursor is None:
+            cursor = self._widths.column(self._cursor)
+
+        self._text_dirty = self._cursor_dirty = False
+
+        if message is self._message:
+            message_width: int = self._message_width
+        else:
+            message_width: int = string_width(remove_ansi_from_string(message))
+
+        drawn: tuple|None = None
+
+        if text is None:
+            if self._patch(message, message_width, cursor):
+                return
+
+            text = self._styled()
+
+            if isinstance(self._highlighter, (WordHighlighter, LexerHighlighter)):
+                self._highlighter.take_damage()
+
+                if not parse_segments(message + ' ')[-1][0]:
+                    drawn = (message, self._highlighter, self._joins_message())
+
+        if isinstance(text, str):
+            segments: list = parse_segments(message + text)
+        else:
+            segments: list = parse_segments(message) + text
+
+        self._renderer.render(
+            segments,
+            message_width + cursor,
+            self._output,
+        )
+        self._drawn = drawn
+
+    def _patch(self, message: str, message_width: int, cursor: int) -> bool:
+        """
+        The task of this method is to draw only the part of the highlighted user's input that has changed
+        since the last frame. This is possible when the last frame showed the same message with the input
+        of the same word or lexer highlighter, and no style of the message or of the formatted words reaches
+        the words after them. The cost of such a frame follows the size of the changed part and not
+        the length of the line.
+
+        :param message: The message of the prompt (may contain ANSI codes).
+        :param message_width: The width of the message in columns.
+        :param cursor: The column of the cursor in the text.
+        :return: bool (False if the whole frame must be drawn)
+        """
+
+        highlighter: WordHighlighter|LexerHighlighter = self._highlighter
+
+        if (
+            self._drawn is None
+            or self._drawn[0] is not message
+            or self._drawn[1] is not highlighter
+            or not highlighter.isolated
+        ):
+            return False
+
+        damage: tuple|None = highlighter.take_damage()
+
+        if damage is None:
+            return self._renderer.patch(message_width, 0, [], message_width + cursor, self._output)
+
+        start, old_end, end = damage
+        length: int = len(self._buffer)
+        joins_message: bool = self._joins_message()
+
+        if (
+            not start and (end == length or self._drawn[2] or joins_message)
+            or self._clusters.previous(start + 1) != start
+            or end < length and self._clusters.previous(end + 1) != end
+        ):
+            return False
+
+        column: int = self._widths.column(start)
+        tail: int = self._widths.width - self._widths.column(end)
+
+        if isinstance(highlighter, LexerHighlighter):
+            segments: list = highlighter.segments(start, end)
+        else:
+            segments: list = parse_segments(highlighter.render_span(start, end))
+
+        if not self._renderer.patch(
+            message_width + column,
+            self._renderer.width - tail - message_width - column,
+            segments,
+            message_width + cursor,
+            self._output,
+        ):
+            return False
+
+        self._drawn = (message, highlighter, joins_message)
+
+        return True
+
+    def _joins_message(self) -> bool:
+        """
+        The task of this method is to check if the user's input starts with a cluster that takes no column
+        (like a lone combining mark), which the terminal draws in the last cell of the message.
+
+        :return: bool
+        """
+
+        return len(self._buffer) > 0 and not self._widths.column(self._clusters.next(0))
+
+    def _resize(self, size: os.terminal_size) -> None:
+        """
+        The task of this method is to adapt the prompt to a new size of the terminal.
+        The limit follows the width of the terminal (a limit that was given is kept while it fits)
+        and the next frame is drawn completely.
+
+        :param size: The new size of the terminal.
+        :return: None
+        """
+
+        if self._requested_limit is None:
+            self.limit = size.columns
+        else:
+            self.limit = min(self._requested_limit, size.columns)
+
+        self._renderer.reset()
+
+    def _should_render(self, reader: InputReader, last_frame: float) -> bool:
+        """
+        The task of this method is to decide if a new frame should be drawn after a key.
+        While more keys are already queued, drawing is postponed so that only the final state is drawn.
+        If the minimum frame interval has not passed yet, keys that arrive in the rest of the interval
+        are applied first as well.
+
+        :param reader: The reader of the terminal input.
+        :param last_frame: The time of the last frame (time.monotonic).
+        :return: bool
+        """
+
+        if reader.pending():
+            return False
+
+        if self._frame_interval:
+            remaining: float = last_frame + self._frame_interval - time.monotonic()
+
+            if remaining > 0 and reader.fill(remaining):
+                return False
+
+        return True
+
+    @contextmanager
+    def _session(self, reader: InputReader, conditions: tuple):
+        """
+        The task of this method is to prepare the terminal for a prompt session, draw the first frame
+        and restore everything at the end of the session, even if an exception is raised.
+        The terminal stays in raw mode for the whole session instead of being toggled for every character,
+        and bracketed paste mode is enabled so that a paste is applied and displayed once
+        (a prompt that is shown inside the conditions of another prompt shares its session).
+        If the prompt has condition threads, the runner of the background conditions is created here.
+
+        :param reader: The reader of the terminal input.
+        :param conditions: Conditions to be checked at the time of entry in the format of a tuple.
+        :return: ConditionRunner|None (the value of the with statement)
+        """
+
+        terminal: Terminal = self._terminal
+        runner: ConditionRunner|None = None
+
+        with raw_mode(reader.fd):
+            if not BaseCprompt._sessions:
+                self._output.write(ENABLE_BRACKETED_PASTE)
+
+            BaseCprompt._sessions += 1
+            reader.watch(terminal.wakeup_fd, 'RESIZE')
+            terminal.subscribe(self._resize)
+
+            try:
+                if self._condition_threads and conditions:
+                    runner = ConditionRunner(conditions, self._condition_threads, self._condition_debounce)
+                    reader.watch(runner.wakeup_fd, 'CONDITIONS')
+
+                self._history_index = None
+                self._begin()
+                self._renderer.reset()
+                self._display()
+                self._output.flush()
+
+                yield runner
+            finally:
+                self._end()
+                terminal.unsubscribe(self._resize)
+                reader.unwatch(terminal.wakeup_fd)
+                BaseCprompt._sessions -= 1
+
+                if runner:
+                    reader.unwatch(runner.wakeup_fd)
+                    runner.close()
+
+                if not BaseCprompt._sessions:
+                    self._output.write(DISABLE_BRACKETED_PASTE)
+
+                self._output.flush()
+
+    def _handle_event(self, event: str, runner: ConditionRunner|None) -> bool:
+        """
+        The task of this method is to handle an event that woke up the key loop instead of a key.
+        After a 'RESIZE' the geometry is refreshed and one complete frame is drawn, and
+        after 'CONDITIONS' the results of the background conditions are applied
+        (a 'CONDITIONS' event without a runner is ignored).
+
+        :param event: The name of the event.
+        :param runner: The runner of the background conditions (if there is one).
+        :return: bool (True if the prompt should exit)
+        """
+
+        if event == 'RESIZE':
+            self._terminal.refresh()
+            self._display()
+            self._output.flush()
+
+        elif event == 'CONDITIONS' and runner is not None and self._apply_condition_results(runner):
+            self._display()
+            self._output.write(NEW_LINE)
+            return True
+
+        return False
+
+    def _apply_key(self, key: str, runner: ConditionRunner|None, exit_status: bool) -> bool:
+        """
+        The task of this method is to apply a key after the conditions have been checked for it
+        (or to submit the conditions to the background after the key is applied).
+
+        :param key: The key that is read from the keyboard.
+        :param runner: The runner of the background conditions (if there is one).
+        :param exit_status: Did a condition ask the prompt to exit?
+        :return: bool (True if the prompt is finished)
+        """
+
+        if self._handle_key(key):
+            return True
+
+        if runner:
+            runner.submit(ConditionSnapshot(self))
+
+        if exit_status:
+            self._display()
+            self._output.write(NEW_LINE)
+            return True
+
+        return False
+
+    @staticmethod
+    def _check_timeouts(timeout: float|None, idle_timeout: float|None) -> None:
+        """
+        The task of this method is to validate the timeouts of a prompt.
+
+        :param timeout: The maximum duration of the prompt in seconds (or None).
+        :param idle_timeout: The maximum time between two keys in seconds (or None).
+        :return: None
+        """
+
+        for name, value in (('timeout', timeout), ('idle_timeout', idle_timeout)):
+            if value is None:
+                continue
+
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                raise TypeError(
+                    f'The type of {name} argument must be int or float, but received "{type(value)}".'
+                )
+
+            if not 0 < value <= threading.TIMEOUT_MAX:
+                raise ValueError(
+                    f'The {name} must be a finite number greater than zero and at most '
+                    f'{threading.TIMEOUT_MAX} seconds, but received {value}.'
+                )
+
+    @staticmethod
+    def _time_left(started: float, last_input: float, timeout: float|None, idle_timeout: float|None) -> float|None:
+        """
+        The task of this method is to return the time that is left until the first deadline of a prompt.
+
+        :param started: The time when the prompt started (time.monotonic).
+        :param last_input: The time of the last key (time.monotonic).
+        :param timeout: The maximum duration of the prompt in seconds (or None).
+        :param idle_timeout: The maximum time between two keys in seconds (or None).
+        :return: float|None (None if the prompt has no deadline)
+        """
+
+        deadlines: list = []
+
+        if timeout is not None:
+            deadlines.append(started + timeout)
+
+        if idle_timeout is not None:
+            deadlines.append(last_input + idle_timeout)
+
+        if not deadlines:
+            return None
+
+        return max(min(deadlines) - time.monotonic(), 0.0)
+
+    def _expire(self) -> None:
+        """
+        The task of this method is to finish the prompt line when a deadline has passed
+        and to raise PromptTimeoutError with the text that has been entered.
+
+        :return: None
+        """
+
+        self._display()
+        self._output.write(NEW_LINE)
+
+        raise PromptTimeoutError(
+            'The prompt was not finished before its deadline.',
+            self._text,
+        )
+
+    def _run(self, conditions: tuple, timeout: float|None=None, idle_timeout: float|None=None) -> None:
+        """
+        The task of this method is to read the keyboard until the input is finished.
+        Keys that are already queued are applied before the next frame is drawn,
+        and keys that change neither the input nor the cursor do not draw a frame at all.
+        When the terminal is resized, the prompt adapts its limit and draws one complete frame.
+        If the prompt has condition threads, the conditions run in the background after each key
+        and their results are applied when they are delivered to the key loop.
+        The waits for keys are bounded by the timeouts, and PromptTimeoutError is raised
+        when one of them passes.
+
+        :param conditions: Conditions to be checked at the time of entry in the format of a tuple.
+        :param timeout: The maximum duration of the prompt in seconds (None means no limit).
+        :param idle_timeout: The maximum time between two keys in seconds (None means no limit).
+        :return: None
+        """
+
+        self._check_timeouts(timeout, idle_timeout)
+        reader: InputReader = get_reader(sys.stdin.fileno())
+
+        with self._session(reader, conditions) as runner:
+            last_frame: float = time.monotonic()
+            started: float = last_frame
+            last_input: float = last_frame
+
+            while True:
+                key: str = readkey(self._time_left(started, last_input, timeout, idle_timeout))
+
+                if key == 'TIMEOUT':
+                    if self._time_left(started, last_input, timeout, idle_timeout) == 0:
+                        self._expire()
+
+                    continue
+
+                if key in ('RESIZE', 'CONDITIONS'):
+                    if self._handle_event(key, runner):
+                        break
+
+                    continue
+
+                last_input = time.monotonic()
+                self._last_key = 'PASTE' if isinstance(key, Paste) else key
+
+                exit_status: bool = False if runner else self._check_conditions(conditions)
+
+                if self._apply_key(key, runner, exit_status):
+                    break
+
+                if (
+                    (self._text_dirty or self._cursor_dirty or self._renderer.is_reset)
+                    and self._should_render(reader, last_frame)
+                ):
+                    self._display()
+                    last_frame = time.monotonic()
+
+                self._output.flush()
+
+    async def _should_render_async(self, keys: AsyncKeyReader, last_frame: float) -> bool:
+        """
+        The task of this method is to decide if a new frame should be drawn after a key in an event loop.
+        It works like _should_render, but the rest of the frame interval is awaited.
+
+        :param keys: The asynchronous key reader of the session.
+        :param last_frame: The time of the last frame (time.monotonic).
+        :return: bool
+        """
+
+        if keys.reader.pending():
+            return False
+
+        if self._frame_interval:
+            remaining: float = last_frame + self._frame_interval - time.monotonic()
+
+            if remaining > 0 and await keys.wait(remaining):
+                return False
+
+        return True
+
+    async def _run_async(self, conditions: tuple, timeout: float|None=None, idle_timeout: float|None=None) -> None:
+        """
+        The task of this method is to read the keyboard until the input is finished without blocking
+        the running asyncio event loop. The file descriptor of the terminal is registered with
+        loop.add_reader, so other tasks keep running while the user types.
+        Conditions can be coroutine functions, and everything else works as in _run.
+
+        :param conditions: Conditions to be checked at the time of entry in the format of a tuple.
+        :param timeout: The maximum duration of the prompt in seconds (None means no limit).
+        :param idle_timeout: The maximum time between two keys in seconds (None means no limit).
+        :return: None
+        """
+
+        self._check_timeouts(timeout, idle_timeout)
+        reader: InputReader = get_reader(sys.stdin.fileno())
+        await self._begin_async()
+
+        with self._session(reader, conditions) as runner:
+            events: dict = {self._terminal.wakeup_fd: 'RESIZE'}
+
+            if runner:
+                events[runner.wakeup_fd] = 'CONDITIONS'
+
+            with AsyncKeyReader(reader, events) as keys:
+                last_frame: float = time.monotonic()
+                started: float = last_frame
+                last_input: float = last_frame
+
+                while True:
+                    key: str = await keys.readkey(self._time_left(started, last_input, timeout, idle_timeout))
+
+                    if key == 'TIMEOUT':
+                        if self._time_left(started, last_input, timeout, idle_timeout) == 0:
+                            self._expire()
+
+                        continue
+
+                    if key in ('RESIZE', 'CONDITIONS'):
+                        if self._handle_event(key, runner):
+                            break
+
+                        continue
+
+                    last_input = time.monotonic()
+                    self._last_key = 'PASTE' if isinstance(key, Paste) else key
+
+                    exit_status: bool = False if runner else await self._check_conditions_async(conditions)
+
+                    if self._apply_key(key, runner, exit_status):
+                        break
+
+                    if (
+                        (self._text_dirty or self._cursor_dirty or self._renderer.is_reset)
+                        and await self._should_render_async(keys, last_frame)
+                    ):
+                        self._display()
+                        last_frame = time.monotonic()
+
+                    self._output.flush()
+
     @abstractmethod
     def _display(self, be_returned: bool = False) -> None | str:
         pass
@@ -488,10 +1700,10 @@ class BaseCprompt(ABC):
         raise TypeError
 
     def __len__(self):
-        return len(self._text)
+        return len(self._buffer)
 
     def __bool__(self):
-        return True if len(self._text) > 0 else False
+        return True if len(self._buffer) > 0 else False
 
     def __str__(self):
         return self._text.__str__()
@@ -0,0 +1,313 @@
+"""
+ ██████╗██████╗ ██████╗  ██████╗ ███╗   ███╗██████╗ ████████╗
+██╔════╝██╔══██╗██╔══██╗██╔═══██╗████╗ ████║██╔══██╗╚══██╔══╝
+██║     ██████╔╝██████╔╝██║   ██║██╔████╔██║██████╔╝   ██║
+██║     ██╔═══╝ ██╔══██╗██║   ██║██║╚██╔╝██║██╔═══╝    ██║
+╚██████╗██║     ██║  ██║╚██████╔╝██║ ╚═╝ ██║██║        ██║
+ ╚═════╝╚═╝     ╚═╝  ╚═╝ ╚═════╝ ╚═╝     ╚═╝╚═╝        ╚═╝
+
+cprompt is a package for creating live and customized one-line prompts that can
+be used to manage and personalize input from the user in the terminal (bash) environment.
+
+cprompt Github repository: https://github.com/mimseyedi/cprompt
+
+This file is related to the text storage of the user's input string.
+The buffers in this file keep the input in a structure that makes edits at the location
+of the cursor cheap, instead of rebuilding the whole string on every keystroke.
+
+GapBuffer is the default storage and is suitable for normal prompts.
+RopeBuffer keeps the text in bounded chunks and is suitable for very long inputs.
+"""
+
+
+from bisect import bisect_right
+from itertools import accumulate
+from abc import ABC, abstractmethod
+
+
+class TextBuffer(ABC):
+    """
+    A basic text storage for the user's input string that all buffers are based on.
+    """
+
+    def __init__(self, text: str=""):
+        self._cache: str|None = None
+        self.clear()
+        if text:
+            self.insert(0, text)
+
+    @abstractmethod
+    def _materialize(self) -> str:
+        pass
+
+    @abstractmethod
+    def insert(self, index: int, text: str) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, start: int, end: int) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def slice(self, start: int, end: int) -> str:
+        """
+        The task of this method is to return a part of the stored text.
+
+        :param start: The start index of the part.
+        :param end: The end index of the part (exclusive).
+        :return: str
+        """
+
+        return self.__str__()[start:end]
+
+    def __str__(self) -> str:
+        if self._cache is None:
+            self._cache = self._materialize()
+
+        return self._cache
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.__str__()!r})'
+
+
+class GapBuffer(TextBuffer):
+    """
+    A text buffer that keeps an empty gap at the location of the last edit.
+    Inserts and deletes next to the gap are amortized O(1), and moving the
+    gap costs only the distance between the old and the new edit location.
+    """
+
+    MIN_GAP: int = 64
+
+    def clear(self) -> None:
+        """
+        The task of this method is to delete the stored text.
+
+        :return: None
+        """
+
+        self._chars: list = [''] * self.MIN_GAP
+        self._gap_start: int = 0
+        self._gap_end: int = self.MIN_GAP
+        self._cache = ""
+
+    def _move_gap(self, index: int) -> None:
+        chars: list = self._chars
+
+        if index < self._gap_start:
+            count: int = self._gap_start - index
+            chars[self._gap_end - count:self._gap_end] = chars[index:self._gap_start]
+            self._gap_start -= count
+            self._gap_end -= count
+
+        elif index > self._gap_start:
+            count: int = index - self._gap_start
+            chars[self._gap_start:self._gap_start + count] = chars[self._gap_end:self._gap_end + count]
+            self._gap_start += count
+            self._gap_end += count
+
+    def _grow(self, needed: int) -> None:
+        size: int = max(needed, len(self._chars), self.MIN_GAP)
+        self._chars[self._gap_end:self._gap_end] = [''] * size
+        self._gap_end += size
+
+    def insert(self, index: int, text: str) -> None:
+        """
+        The task of this method is to insert a text at the desired index.
+
+        :param index: The index where the text is inserted.
+        :param text: The text to be inserted.
+        :return: None
+        """
+
+        if not text:
+            return
+
+        self._move_gap(index)
+
+        if self._gap_end - self._gap_start < len(text):
+            self._grow(len(text))
+
+        self._chars[self._gap_start:self._gap_start + len(text)] = text
+        self._gap_start += len(text)
+        self._cache = None
+
+    def delete(self, start: int, end: int) -> None:
+        """
+        The task of this method is to delete the text between two indexes.
+
+        :param start: The start index of the deleted part.
+        :param end: The end index of the deleted part (exclusive).
+        :return: None
+        """
+
+        if start >= end:
+            return
+
+        self._move_gap(end)
+        self._gap_start = start
+        self._cache = None
+
+    def _materialize(self) -> str:
+        return ''.join(self._chars[:self._gap_start]) + ''.join(self._chars[self._gap_end:])
+
+    def slice(self, start: int, end: int) -> str:
+        """
+        The task of this method is to return a part of the stored text.
+        Only the characters of the part are joined, on each side of the gap.
+
+        :param start: The start index of the part.
+        :param end: The end index of the part (exclusive).
+        :return: str
+        """
+
+        if self._cache is not None:
+            return self._cache[start:end]
+
+        start, end, _ = slice(start, end).indices(len(self))
+
+        if start >= end:
+            return ""
+
+        gap: int = self._gap_end - self._gap_start
+
+        if end <= self._gap_start:
+            return ''.join(self._chars[start:end])
+
+        if start >= self._gap_start:
+            return ''.join(self._chars[start + gap:end + gap])
+
+        return ''.join(self._chars[start:self._gap_start]) + ''.join(self._chars[self._gap_end:end + gap])
+
+    def __len__(self) -> int:
+        return len(self._chars) - (self._gap_end - self._gap_start)
+
+
+class RopeBuffer(TextBuffer):
+    """
+    A text buffer that keeps the text in a sequence of bounded chunks.
+    An edit only rebuilds the chunk it touches, so the cost of an edit does not
+    depend on the length of the whole text.
+    """
+
+    CHUNK_SIZE: int = 512
+
+    def clear(self) -> None:
+        """
+        The task of this method is to delete the stored text.
+
+        :return: None
+        """
+
+        self._chunks: list = []
+        self._offsets: list|None = []
+        self._length: int = 0
+        self._cache = ""
+
+    def _get_offsets(self) -> list:
+        if self._offsets is None:
+            self._offsets = list(accumulate(map(len, self._chunks), initial=0))[:-1]
+
+        return self._offsets
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        if not self._chunks:
+            self._chunks.append("")
+            self._offsets = [0]
+
+        offsets: list = self._get_offsets()
+        chunk_index: int = max(bisect_right(offsets, index) - 1, 0)
+
+        return chunk_index, index - offsets[chunk_index]
+
+    def _split(self, chunk_index: int) -> None:
+        chunk: str = self._chunks[chunk_index]
+
+        if len(chunk) > self.CHUNK_SIZE * 2:
+            self._chunks[chunk_index:chunk_index + 1] = [
+                chunk[i:i + self.CHUNK_SIZE] for i in range(0, len(chunk), self.CHUNK_SIZE)
+            ]
+
+    def insert(self, index: int, text: str) -> None:
+        """
+        The task of this method is to insert a text at the desired index.
+
+        :param index: The index where the text is inserted.
+        :param text: The text to be inserted.
+        :return: None
+        """
+
+        if not text:
+            return
+
+        chunk_index, offset = self._locate(index)
+        chunk: str = self._chunks[chunk_index]
+
+        self._chunks[chunk_index] = chunk[:offset] + text + chunk[offset:]
+        self._split(chunk_index)
+        self._length += len(text)
+        self._offsets = None
+        self._cache = None
+
+    def delete(self, start: int, end: int) -> None:
+        """
+        The task of this method is to delete the text between two indexes.
+
+        :param start: The start index of the deleted part.
+        :param end: The end index of the deleted part (exclusive).
+        :return: None
+        """
+
+        if start >= end:
+            return
+
+        first, first_offset = self._locate(start)
+        last, last_offset = self._locate(end)
+
+        if last_offset == 0 and last > first:
+            last -= 1
+            last_offset = len(self._chunks[last])
+
+        merged: str = self._chunks[first][:first_offset] + self._chunks[last][last_offset:]
+
+        self._chunks[first:last + 1] = [merged] if merged else []
+        self._length -= end - start
+        self._offsets = None
+        self._cache = None
+
+    def slice(self, start: int, end: int) -> str:
+        """
+        The task of this method is to return a part of the stored text.
+        Only the chunks that overlap the part are joined together.
+
+        :param start: The start index of the part.
+        :param end: The end index of the part (exclusive).
+        :return: str
+        """
+
+        if self._cache is not None:
+            return self._cache[start:end]
+
+        start, end = max(start, 0), min(end, self._length)
+
+        if start >= end:
+            return ""
+
+        first, first_offset = self._locate(start)
+        last, _ = self._locate(end)
+
+        joined: str = ''.join(self._chunks[first:last + 1])
+        return joined[first_offset:first_offset + end - start]
+
+    def _materialize(self) -> str:
+        return ''.join(self._chunks)
+
+    def __len__(self) -> int:
+        return self._length
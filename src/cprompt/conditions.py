@@ -0,0 +1,255 @@
+"""
+ ██████╗██████╗ ██████╗  ██████╗ ███╗   ███╗██████╗ ████████╗
+██╔════╝██╔══██╗██╔══██╗██╔═══██╗████╗ ████║██╔══██╗╚══██╔══╝
+██║     ██████╔╝██████╔╝██║   ██║██╔████╔██║██████╔╝   ██║
+██║     ██╔═══╝ ██╔══██╗██║   ██║██║╚██╔╝██║██╔═══╝    ██║
+╚██████╗██║     ██║  ██║╚██████╔╝██║ ╚═╝ ██║██║        ██║
+ ╚═════╝╚═╝     ╚═╝  ╚═╝ ╚═════╝ ╚═╝     ╚═╝╚═╝        ╚═╝
+
+cprompt is a package for creating live and customized one-line prompts that can
+be used to manage and personalize input from the user in the terminal (bash) environment.
+
+cprompt Github repository: https://github.com/mimseyedi/cprompt
+
+
+This file is related to running the conditions of a prompt in the background.
+When a prompt has condition threads, the conditions do not run in the key loop.
+After each key, a snapshot of the prompt is given to a thread pool; the run waits for the debounce
+time first and is cancelled if another key arrives in the meantime. The results are delivered back
+to the key loop through a self-pipe that the input reader watches, and a result is only applied
+if no newer key was submitted and the text has not been edited since its snapshot.
+
+A condition that only depends on the input and the last key can be marked with the pure_condition
+decorator; the prompt then reuses its last result while the edit version and the last key are the same.
+"""
+
+
+import os
+import queue
+import threading
+from functools import wraps
+from typing import Callable, NamedTuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+def pure_condition(func: Callable) -> Callable:
+    """
+    The task of this decorator is to mark a condition as pure: its result depends only on
+    the user's input and the last key, and it has no side effects. A pure condition is not run
+    again for a key that leaves the input unchanged and is the same as the previous key.
+
+    :param func: A condition.
+    :return: Callable
+    """
+
+    @wraps(func)
+    def condition(prompt):
+        return func(prompt)
+
+    condition.__pure_condition__ = True
+
+    return condition
+
+
+def is_pure_condition(func: Callable) -> bool:
+    """
+    The task of this function is to check if a condition is marked with the pure_condition decorator.
+
+    :param func: A condition.
+    :return: bool
+    """
+
+    return getattr(func, '__pure_condition__', False)
+
+
+class ConditionSnapshot:
+    """
+    A read-only copy of the state of a prompt that is given to the conditions in the background.
+    The conditions can read the same attributes as on a prompt, but cannot edit or draw it.
+    """
+
+    def __init__(self, prompt):
+        self.message: str = prompt.message
+        self.text: str = prompt.text
+        self.cursor: int = prompt.cursor
+        self.last_key: str = prompt.last_key
+        self.formatted: dict = prompt.formatted
+        self.returned_value = prompt.returned_value
+        self.version: int = prompt.version
+
+    def get_word_before_cursor(self) -> str:
+        splitted_text: list = self.text[:self.cursor].split()
+        return splitted_text[-1] if splitted_text else ''
+
+    def get_word_after_cursor(self) -> str:
+        splitted_text: list = self.text[self.cursor:].split()
+        return splitted_text[0] if splitted_text else ''
+
+    def get_text_before_cursor(self) -> str:
+        return self.text[:self.cursor]
+
+    def get_text_after_cursor(self) -> str:
+        return self.text[self.cursor:]
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}('
+            f'text={self.text!r}, '
+            f'cursor={self.cursor}, '
+            f'last_key={self.last_key!r}, '
+            f'version={self.version})'
+        )
+
+
+class ConditionResult(NamedTuple):
+    """
+    The result of running the conditions on a snapshot.
+    """
+
+    ticket: int
+    version: int
+    returned_value: object
+    exit_status: bool
+    error: BaseException|None
+
+
+class ConditionRunner:
+    """
+    A debounced runner of the conditions of a prompt on a thread pool.
+    """
+
+    def __init__(self, conditions: tuple, threads: int=1, debounce: float=0.0):
+        self.conditions: tuple = conditions
+        self.debounce: float = debounce
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=threads,
+            thread_name_prefix='cprompt-conditions',
+        )
+        self._results: queue.SimpleQueue = queue.SimpleQueue()
+        self._ticket: int = 0
+        self._future: Future|None = None
+        self._cancelled: threading.Event = threading.Event()
+        self._lock: threading.Lock = threading.Lock()
+        self._closed: bool = False
+        self._wakeup_read, self._wakeup_write = os.pipe()
+
+        os.set_blocking(self._wakeup_read, False)
+        os.set_blocking(self._wakeup_write, False)
+
+    @property
+    def wakeup_fd(self) -> int:
+        """
+        A getter method to get the file descriptor that becomes readable when a result is ready.
+
+        :return: int
+        """
+
+        return self._wakeup_read
+
+    @property
+    def ticket(self) -> int:
+        """
+        A getter method to get the number of the last submitted run.
+
+        :return: int
+        """
+
+        return self._ticket
+
+    def _cancel(self) -> None:
+        self._cancelled.set()
+
+        if self._future is not None:
+            self._future.cancel()
+
+    def submit(self, snapshot: ConditionSnapshot) -> None:
+        """
+        The task of this method is to run the conditions on a snapshot in the background.
+        The previous run is cancelled: if it has not started yet it never starts,
+        and if it is waiting for the debounce time or still running, its result is dropped.
+
+        :param snapshot: The snapshot of the prompt after the last key.
+        :return: None
+        """
+
+        self._cancel()
+        self._ticket += 1
+        self._cancelled = threading.Event()
+        self._future = self._executor.submit(self._evaluate, self._ticket, snapshot, self._cancelled)
+
+    def _evaluate(self, ticket: int, snapshot: ConditionSnapshot, cancelled: threading.Event) -> None:
+        """
+        The task of this method is to run all the conditions on a snapshot in a worker thread
+        and to deliver the result to the key loop. As in the key loop, the value returned by
+        the last condition is kept and SystemExit asks the prompt to exit.
+
+        :param ticket: The number of this run.
+        :param snapshot: The snapshot of the prompt.
+        :param cancelled: The event that is set when a newer run is submitted.
+        :return: None
+        """
+
+        if cancelled.wait(self.debounce) if self.debounce else cancelled.is_set():
+            return
+
+        returned_value = snapshot.returned_value
+        exit_status: bool = False
+        error: BaseException|None = None
+
+        for func in self.conditions:
+            try:
+                returned_value = func(snapshot)
+            except SystemExit:
+                exit_status = True
+            except Exception as exception:
+                error = exception
+                break
+
+        with self._lock:
+            if cancelled.is_set() or self._closed:
+                return
+
+            self._results.put(ConditionResult(ticket, snapshot.version, returned_value, exit_status, error))
+
+            try:
+                os.write(self._wakeup_write, b'\0')
+            except BlockingIOError:
+                pass
+
+    def results(self) -> list[ConditionResult]:
+        """
+        The task of this method is to return the results that were delivered since the last call.
+        The self-pipe is drained as well.
+
+        :return: list[ConditionResult]
+        """
+
+        try:
+            while os.read(self._wakeup_read, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        results: list = []
+
+        while True:
+            try:
+                results.append(self._results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def close(self) -> None:
+        """
+        The task of this method is to cancel the pending run and release the threads and the self-pipe.
+        A condition that is still running finishes in the background and its result is dropped.
+
+        :return: None
+        """
+
+        self._cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+        with self._lock:
+            self._closed = True
+            os.close(self._wakeup_read)
+            os.close(self._wakeup_write)
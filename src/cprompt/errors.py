@@ -45,4 +45,21 @@ class FormattedTypeError(CpromptError):
     """
     This error is to specify errors related to the type of keys and the values of the formatted attribute.
     (formatted: dict = {str: str, ...})
-    """
\ No newline at end of file
+    """
+
+
+class KeyNotRecognizedError(CpromptError):
+    """
+    This error is to specify errors related to keys that are not recognized by the cprompt package.
+    """
+
+
+class PromptTimeoutError(CpromptError):
+    """
+    This error is to specify that a prompt was not finished before its timeout or idle timeout.
+    (The text that the user had entered until then is kept in the text attribute)
+    """
+
+    def __init__(self, message: str, text: str=""):
+        super().__init__(message)
+        self.text: str = text
@@ -0,0 +1,328 @@
+"""
+ ██████╗██████╗ ██████╗  ██████╗ ███╗   ███╗██████╗ ████████╗
+██╔════╝██╔══██╗██╔══██╗██╔═══██╗████╗ ████║██╔══██╗╚══██╔══╝
+██║     ██████╔╝██████╔╝██║   ██║██╔████╔██║██████╔╝   ██║
+██║     ██╔═══╝ ██╔══██╗██║   ██║██║╚██╔╝██║██╔═══╝    ██║
+╚██████╗██║     ██║  ██║╚██████╔╝██║ ╚═╝ ██║██║        ██║
+ ╚═════╝╚═╝     ╚═╝  ╚═╝ ╚═════╝ ╚═╝     ╚═╝╚═╝        ╚═╝
+
+cprompt is a package for creating live and customized one-line prompts that can
+be used to manage and personalize input from the user in the terminal (bash) environment.
+
+cprompt Github repository: https://github.com/mimseyedi/cprompt
+
+
+This file is related to splitting the user's input string into grapheme clusters
+(the characters that the user sees, like a letter with its combining accents, a flag
+or an emoji sequence joined with zero-width joiners). The cursor moves over whole clusters
+and deletions remove whole clusters, so a cluster is never split on the screen.
+
+The GraphemeIndex keeps the lengths of the clusters of the input in prefix sums and follows
+its edits: the input is segmented again from the cluster before the edit and segmentation stops
+as soon as a new cluster boundary meets an old boundary after the edit.
+The rules are a compact subset of the extended grapheme cluster rules of UAX #29.
+"""
+
+
+import unicodedata
+from bisect import bisect_right
+from functools import lru_cache
+from buffer import TextBuffer
+from prefix import PrefixSums
+
+
+OTHER, CONTROL, EXTEND, ZWJ, SPACING_MARK, REGIONAL_INDICATOR, PICTOGRAPHIC, L, V, T, LV, LVT = range(12)
+
+# Ranges of extended pictographic characters (mostly emoji), without the regional indicators
+# and the emoji modifiers that are handled separately.
+_PICTOGRAPHIC_RANGES: tuple = (
+    (0x000A9, 0x000A9), (0x000AE, 0x000AE), (0x0203C, 0x0203C), (0x02049, 0x02049),
+    (0x02122, 0x02122), (0x02139, 0x02139), (0x02194, 0x02199), (0x021A9, 0x021AA),
+    (0x0231A, 0x0231B), (0x02328, 0x02328), (0x023CF, 0x023CF), (0x023E9, 0x023F3),
+    (0x023F8, 0x023FA), (0x024C2, 0x024C2), (0x025AA, 0x025AB), (0x025B6, 0x025B6),
+    (0x025C0, 0x025C0), (0x025FB, 0x025FE), (0x02600, 0x027BF), (0x02934, 0x02935),
+    (0x02B05, 0x02B07), (0x02B1B, 0x02B1C), (0x02B50, 0x02B50), (0x02B55, 0x02B55),
+    (0x03030, 0x03030), (0x0303D, 0x0303D), (0x03297, 0x03297), (0x03299, 0x03299),
+    (0x1F000, 0x1F1E5), (0x1F200, 0x1F3FA), (0x1F400, 0x1FAFF), (0x1FC00, 0x1FFFD),
+)
+
+_PICTOGRAPHIC_STARTS: tuple = tuple(start for start, _ in _PICTOGRAPHIC_RANGES)
+_PICTOGRAPHIC_ENDS: tuple = tuple(end for _, end in _PICTOGRAPHIC_RANGES)
+
+
+@lru_cache(maxsize=4096)
+def grapheme_property(char: str) -> int:
+    """
+    The task of this function is to return the grapheme cluster break property of a character.
+
+    :param char: A string containing a single character.
+    :return: int (one of the property constants of this module)
+    """
+
+    codepoint: int = ord(char)
+
+    if 0x20 <= codepoint < 0x7F:
+        return OTHER
+
+    if codepoint == 0x200D:
+        return ZWJ
+
+    if 0x1F1E6 <= codepoint <= 0x1F1FF:
+        return REGIONAL_INDICATOR
+
+    if 0x1F3FB <= codepoint <= 0x1F3FF or 0xE0020 <= codepoint <= 0xE007F or codepoint in (0x200C, 0xFF9E, 0xFF9F):
+        return EXTEND
+
+    if 0x1100 <= codepoint <= 0x115F or 0xA960 <= codepoint <= 0xA97C:
+        return L
+
+    if 0x1160 <= codepoint <= 0x11A7 or 0xD7B0 <= codepoint <= 0xD7C6:
+        return V
+
+    if 0x11A8 <= codepoint <= 0x11FF or 0xD7CB <= codepoint <= 0xD7FB:
+        return T
+
+    if 0xAC00 <= codepoint <= 0xD7A3:
+        return LV if (codepoint - 0xAC00) % 28 == 0 else LVT
+
+    category: str = unicodedata.category(char)
+
+    if category in ('Mn', 'Me'):
+        return EXTEND
+
+    if category == 'Mc':
+        return SPACING_MARK
+
+    if category in ('Cc', 'Cf', 'Zl', 'Zp'):
+        return CONTROL
+
+    index: int = bisect_right(_PICTOGRAPHIC_STARTS, codepoint) - 1
+
+    if index >= 0 and codepoint <= _PICTOGRAPHIC_ENDS[index]:
+        return PICTOGRAPHIC
+
+    return OTHER
+
+
+def next_boundary(text: str, position: int) -> int:
+    """
+    The task of this function is to return the end of the grapheme cluster that starts at a position.
+    The result depends only on the text from the position onwards.
+
+    :param text: A string.
+    :param position: The start of a grapheme cluster (smaller than the length of the text).
+    :return: int
+    """
+
+    length: int = len(text)
+    char: str = text[position]
+    index: int = position + 1
+
+    if char == '\r':
+        return index + 1 if index < length and text[index] == '\n' else index
+
+    kind: int = grapheme_property(char)
+
+    if kind == CONTROL:
+        return index
+
+    if kind == REGIONAL_INDICATOR:
+        if index < length and grapheme_property(text[index]) == REGIONAL_INDICATOR:
+            index += 1
+
+    elif kind in (L, V, T, LV, LVT):
+        while index < length:
+            following: int = grapheme_property(text[index])
+
+            if (
+                kind == L and following in (L, V, LV, LVT)
+                or kind in (LV, V) and following in (V, T)
+                or kind in (LVT, T) and following == T
+            ):
+                kind = following
+                index += 1
+            else:
+                break
+
+    pictographic: bool = kind == PICTOGRAPHIC
+
+    while index < length:
+        following: int = grapheme_property(text[index])
+
+        if following == ZWJ:
+            if (
+                pictographic and index + 1 < length
+                and grapheme_property(text[index + 1]) == PICTOGRAPHIC
+            ):
+                index += 2
+                continue
+
+            pictographic = False
+
+        elif following == SPACING_MARK:
+            pictographic = False
+
+        elif following != EXTEND:
+            break
+
+        index += 1
+
+    return index
+
+
+def split_graphemes(text: str) -> list[str]:
+    """
+    The task of this function is to split a text into its grapheme clusters.
+
+    :param text: A string.
+    :return: list[str]
+    """
+
+    clusters: list = []
+    position: int = 0
+
+    while position < len(text):
+        end: int = next_boundary(text, position)
+        clusters.append(text[position:end])
+        position = end
+
+    return clusters
+
+
+class GraphemeIndex:
+    """
+    The grapheme clusters of the user's input string, kept as prefix sums of cluster lengths.
+    """
+
+    WINDOW: int = 64
+
+    def __init__(self):
+        self._lengths: PrefixSums = PrefixSums()
+        self._changed: tuple = (0, 0, 0, [])
+
+    def reset(self, text: str="") -> None:
+        """
+        The task of this method is to segment a whole text from the beginning.
+
+        :param text: The new user's input string.
+        :return: None
+        """
+
+        lengths: list = list(map(len, split_graphemes(text)))
+
+        self._changed = (0, len(self._lengths), 0, lengths)
+        self._lengths.reset(lengths)
+
+    def edit(self, buffer: TextBuffer, start: int, end: int, length: int) -> None:
+        """
+        The task of this method is to update the clusters after an edit of the user's input string.
+        Segmentation resumes at the start of the cluster before the edit, and only a window
+        of the buffer around the edit is read.
+
+        :param buffer: The text buffer after the edit.
+        :param start: The start index of the edit.
+        :param end: The end index of the replaced text (before the edit).
+        :param length: The length of the new text that is inserted at the start index.
+        :return: None
+        """
+
+        if not len(self._lengths):
+            self.reset(buffer.__str__())
+            return
+
+        old_lengths: PrefixSums = self._lengths
+        delta: int = length - (end - start)
+        total: int = len(buffer)
+
+        first: int = min(old_lengths.find(start - 1) if start else 0, len(old_lengths) - 1)
+        origin: int = old_lengths.prefix(first)
+
+        window_end: int = min(start + length + self.WINDOW, total)
+        window: str = buffer.slice(origin, window_end)
+
+        lengths: list = []
+        last: int = len(old_lengths)
+        position: int = origin
+
+        while position < total:
+            boundary: int = origin + next_boundary(window, position - origin)
+
+            if boundary == window_end and window_end < total:
+                window_end = min(window_end + max(self.WINDOW, window_end - origin), total)
+                window = buffer.slice(origin, window_end)
+                continue
+
+            lengths.append(boundary - position)
+            position = boundary
+
+            old_end: int = boundary - delta
+
+            if old_end >= end:
+                index: int = old_lengths.find(old_end)
+
+                if index > first and old_lengths.prefix(index) == old_end:
+                    last = index
+                    break
+
+        self._changed = (first, last, origin, lengths)
+        old_lengths.splice(first, last, lengths)
+
+    @property
+    def changed(self) -> tuple:
+        """
+        A getter method to get the clusters that the last edit (or reset) replaced.
+        The value is a tuple of the index of the first replaced cluster, the end of the replaced
+        clusters (exclusive), the start index of the first new cluster in the text and the lengths
+        of the new clusters.
+
+        :return: tuple[int, int, int, list]
+        """
+
+        return self._changed
+
+    def cluster(self, index: int) -> int:
+        """
+        The task of this method is to return the number of the cluster that contains an index
+        (the number of clusters before the index, if the index is at the start of a cluster).
+
+        :param index: An index of the user's input string.
+        :return: int
+        """
+
+        return self._lengths.find(index)
+
+    def previous(self, index: int) -> int:
+        """
+        The task of this method is to return the start of the cluster before an index.
+
+        :param index: An index of the user's input string.
+        :return: int
+        """
+
+        if index <= 0:
+            return 0
+
+        return self._lengths.prefix(self._lengths.find(index - 1))
+
+    def next(self, index: int) -> int:
+        """
+        The task of this method is to return the end of the cluster after an index.
+
+        :param index: An index of the user's input string.
+        :return: int
+        """
+
+        return self._lengths.prefix(self._lengths.find(index) + 1)
+
+    @property
+    def length(self) -> int:
+        """
+        A getter method to get the length of the segmented text (the sum of the cluster lengths).
+
+        :return: int
+        """
+
+        return self._lengths.total
+
+    def __len__(self) -> int:
+        return len(self._lengths)
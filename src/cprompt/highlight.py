@@ -0,0 +1,443 @@
+"""
+ ██████╗██████╗ ██████╗  ██████╗ ███╗   ███╗██████╗ ████████╗
+██╔════╝██╔══██╗██╔══██╗██╔═══██╗████╗ ████║██╔══██╗╚══██╔══╝
+██║     ██████╔╝██████╔╝██║   ██║██╔████╔██║██████╔╝   ██║
+██║     ██╔═══╝ ██╔══██╗██║   ██║██║╚██╔╝██║██╔═══╝    ██║
+╚██████╗██║     ██║  ██║╚██████╔╝██║ ╚═╝ ██║██║        ██║
+ ╚═════╝╚═╝     ╚═╝  ╚═╝ ╚═════╝ ╚═╝     ╚═╝╚═╝        ╚═╝
+
+cprompt is a package for creating live and customized one-line prompts that can
+be used to manage and personalize input from the user in the terminal (bash) environment.
+
+cprompt Github repository: https://github.com/mimseyedi/cprompt
+
+This file is related to highlighting the user's input string with the formatted data of a prompt.
+The WordHighlighter keeps the input as a list of tokens (words and single spaces) together with
+the rendered form of each token and the prefix sums of their lengths. After an edit, only the tokens
+around the edited region are lexed and rendered again, and the changed part is recorded so that
+the renderer can draw only that part, so the cost of highlighting follows the size of the edit
+and not the length of the line.
+
+The PatternHighlighter is used when the formatted data contains multi-word phrases or when
+regex rules are added. It compiles all the formatted entries into a single trie-shaped regex
+(together with the rules) and highlights the input with one linear pass.
+"""
+
+
+import re
+from buffer import TextBuffer
+from prefix import PrefixSums
+from render import parse_segments
+from ansi import RESET
+
+
+_TOKEN_REGEX = re.compile(r' |[^ ]+')
+
+
+class WordHighlighter:
+    """
+    An incremental highlighter that replaces whole words with their formatted form.
+    """
+
+    def __init__(self, formatted: dict):
+        self._tokens: list = []
+        self._rendered: list = []
+        self._lengths: PrefixSums = PrefixSums()
+        self._damage: tuple|None = (0, 0)
+        self._taken: int = 0
+        self.set_formatted(formatted)
+
+    def _render_token(self, token: str) -> str:
+        return self._formatted.get(token, token)
+
+    def _token_at(self, index: int) -> int:
+        return min(self._lengths.find(index), len(self._tokens) - 1)
+
+    def set_formatted(self, formatted: dict) -> None:
+        """
+        The task of this method is to change the formatted data and render all the tokens again.
+
+        :param formatted: The formatted data of the prompt.
+        :return: None
+        """
+
+        self._formatted = formatted
+        self._isolated: bool = not any(parse_segments(value + ' ')[-1][0] for value in formatted.values())
+        self._rendered = list(map(self._render_token, self._tokens))
+        self._damage = (0, 0)
+
+    def reset(self, text: str="") -> None:
+        """
+        The task of this method is to lex and render a whole text from the beginning.
+
+        :param text: The new user's input string.
+        :return: None
+        """
+
+        self._tokens = _TOKEN_REGEX.findall(text)
+        self._rendered = list(map(self._render_token, self._tokens))
+        self._lengths.reset(map(len, self._tokens))
+        self._damage = (0, 0)
+
+    def edit(self, buffer: TextBuffer, start: int, end: int, length: int) -> None:
+        """
+        The task of this method is to update the tokens after an edit of the user's input string.
+        The region between the tokens that touch the edit is lexed again from the buffer,
+        and the rest of the tokens and their rendered forms are kept.
+
+        :param buffer: The text buffer after the edit.
+        :param start: The start index of the edit.
+        :param end: The end index of the replaced text (before the edit).
+        :param length: The length of the new text that is inserted at the start index.
+        :return: None
+        """
+
+        if not self._tokens:
+            self.reset(buffer.__str__())
+            return
+
+        length_before: int = self._lengths.total
+
+        first: int = self._token_at(max(start - 1, 0))
+        last: int = self._token_at(end)
+
+        region_start: int = self._lengths.prefix(first)
+        region_end: int = max(self._lengths.prefix(last + 1), end)
+
+        tokens: list = _TOKEN_REGEX.findall(buffer.slice(region_start, region_end + length - (end - start)))
+
+        self._tokens[first:last + 1] = tokens
+        self._rendered[first:last + 1] = map(self._render_token, tokens)
+        self._lengths.splice(first, last + 1, list(map(len, tokens)))
+
+        if self._damage is None:
+            self._damage = (region_start, length_before - region_end)
+        else:
+            self._damage = (min(self._damage[0], region_start), min(self._damage[1], length_before - region_end))
+
+    def render(self) -> str:
+        """
+        The task of this method is to return the highlighted user's input string.
+
+        :return: str
+        """
+
+        return ''.join(self._rendered)
+
+    def take_damage(self) -> tuple|None:
+        """
+        The task of this method is to return the part of the text that has changed since the last call
+        and to start recording the changes again. The changed part always starts and ends at token
+        boundaries, and everything outside it is rendered exactly as before.
+
+        :return: tuple[int, int, int]|None (the start of the changed part, its end before the changes
+                 and its end after the changes, or None if nothing has changed)
+        """
+
+        damage: tuple|None = self._damage
+        taken: int = self._taken
+
+        self._damage = None
+        self._taken = self._lengths.total
+
+        if damage is None:
+            return None
+
+        return damage[0], taken - damage[1], self._lengths.total - damage[1]
+
+    def render_span(self, start: int, end: int) -> str:
+        """
+        The task of this method is to return the highlighted form of a part of the text
+        that starts and ends at token boundaries (see take_damage).
+
+        :param start: The start index of the part.
+        :param end: The end index of the part (exclusive).
+        :return: str
+        """
+
+        return ''.join(self._rendered[self._lengths.find(start):self._lengths.find(end)])
+
+    @property
+    def isolated(self) -> bool:
+        """
+        A getter method to check if the style of every formatted word ends with the word,
+        so that a part of the text can be rendered without the tokens before it.
+
+        :return: bool
+        """
+
+        return self._isolated
+
+    @property
+    def tokens(self) -> list:
+        """
+        A getter method to get the current tokens of the user's input string.
+
+        :return: list
+        """
+
+        return self._tokens.copy()
+
+
+def _trie_pattern(node: dict) -> str:
+    """
+    The task of this function is to convert a trie of words into a regex pattern.
+    Longer continuations are tried first, so the pattern prefers the longest entry.
+
+    :param node: A trie node (a dictionary from characters to child nodes,
+                 the None key marks the end of a word).
+    :return: str
+    """
+
+    alternatives: list = [
+        re.escape(char) + _trie_pattern(child)
+        for char, child in sorted(node.items(), key=lambda item: item[0] or '')
+        if char is not None
+    ]
+
+    if not alternatives:
+        return ''
+
+    if len(alternatives) == 1 and None not in node:
+        return alternatives[0]
+
+    group: str = '(?:' + '|'.join(alternatives) + ')'
+
+    return group + '?' if None in node else group
+
+
+def compile_words(words) -> str:
+    """
+    The task of this function is to compile words and phrases into one regex pattern
+    that matches them as whole words (between spaces or the edges of the text).
+    The pattern is built from a trie of the words, so matching does not slow down
+    as more words are added.
+
+    :param words: An iterable of words and phrases.
+    :return: str
+    """
+
+    trie: dict = {}
+
+    for word in words:
+        node: dict = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[None] = True
+
+    return r'(?<!\S)(?:' + _trie_pattern(trie) + r')(?!\S)'
+
+
+_GLOBAL_FLAGS_REGEX = re.compile(r'(?:\(\?[aiLmsux]+\))+')
+_SCOPED_FLAGS: tuple = ((re.ASCII, 'a'), (re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'), (re.VERBOSE, 'x'))
+_OCTAL_DIGITS: str = '01234567'
+
+
+def _shift_references(pattern: str, offset: int) -> str:
+    """
+    The task of this function is to add an offset to the numbered group references of a regex pattern
+    (backreferences like \\1 and conditional groups like (?(1)...)), so that the pattern keeps matching
+    the same text after it is placed after other groups in a larger regex.
+
+    :param pattern: The regex pattern.
+    :param offset: The number of groups that come before the pattern.
+    :return: str
+    """
+
+    output: list = []
+    index: int = 0
+    in_class: bool = False
+
+    while index < len(pattern):
+        char: str = pattern[index]
+
+        if char == '\\':
+            following: str = pattern[index + 1:index + 4]
+
+            if (in_class or not following[:1].isdigit() or following[0] == '0'
+                    or (len(following) == 3 and all(digit in _OCTAL_DIGITS for digit in following))):
+                output.append(pattern[index:index + 2])
+                index += 2
+                continue
+
+            digits: str = following[:2] if following[1:2].isdigit() else following[0]
+            output.append('\\' + str(int(digits) + offset))
+            index += 1 + len(digits)
+            continue
+
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+            output.append(char)
+            index += 1
+
+            if pattern.startswith('^', index):
+                output.append('^')
+                index += 1
+            if pattern.startswith(']', index):
+                output.append(']')
+                index += 1
+
+            continue
+        elif pattern.startswith('(?(', index):
+            end: int = pattern.find(')', index)
+
+            if end != -1 and pattern[index + 3:end].isdigit():
+                output.append(f'(?({int(pattern[index + 3:end]) + offset})')
+                index = end + 1
+                continue
+
+        output.append(char)
+        index += 1
+
+    return ''.join(output)
+
+
+def compile_rule(pattern: str|re.Pattern, name: str, offset: int) -> tuple:
+    """
+    The task of this function is to convert a highlighting rule into a named group that can be
+    joined with other rules into one regex. The flags of the rule (the flags of a compiled pattern
+    or the inline flags at the start of a string) are kept in a scoped flags group, and its numbered
+    group references are shifted by the number of groups that come before it.
+
+    :param pattern: The regex rule (a string or a compiled pattern).
+    :param name: The name of the group that wraps the rule.
+    :param offset: The number of groups that come before the rule in the joined regex.
+    :return: tuple (the pattern of the group, the number of groups in it)
+    """
+
+    compiled: re.Pattern = re.compile(pattern)
+
+    if not isinstance(compiled.pattern, str):
+        raise TypeError(
+            f'The regex rules must be string patterns, but received "{type(compiled.pattern)}".'
+        )
+
+    for group in compiled.groupindex:
+        if re.fullmatch(r'_f|_r\d+', group):
+            raise ValueError(
+                f'The group name "{group}" of the regex rule {compiled.pattern!r} is reserved.'
+            )
+
+    global_flags: re.Match|None = _GLOBAL_FLAGS_REGEX.match(compiled.pattern)
+    source: str = compiled.pattern[global_flags.end():] if global_flags else compiled.pattern
+    source = _shift_references(source, offset + 1)
+    flags: str = ''.join(letter for flag, letter in _SCOPED_FLAGS if compiled.flags & flag)
+
+    if flags:
+        # A verbose pattern may end with a comment, so the scoped group is closed on a new line.
+        source = f'(?{flags}:{source}\n)' if 'x' in flags else f'(?{flags}:{source})'
+
+    return f'(?P<{name}>{source})', compiled.groups + 1
+
+
+class PatternHighlighter:
+    """
+    A highlighter that matches formatted words, multi-word phrases and regex rules
+    with a single compiled regex.
+    """
+
+    def __init__(self, formatted: dict, rules: dict=None):
+        self._formatted: dict = formatted
+        self._rules: list = list((rules or {}).values())
+        self._patterns: list = list((rules or {}).keys())
+        self._text: str = ""
+        self._rendered: str|None = ""
+        self._compile()
+
+    def _compile(self) -> None:
+        """
+        The task of this method is to compile the formatted entries and the rules into one regex.
+        Each rule keeps its own flags and group references (see compile_rule). At the same location, the formatted entries win over the rules, the longest formatted entry
+        wins over the shorter ones and the rules are tried in their order.
+
+        :return: None
+        """
+
+        parts: list = []
+
+        if self._formatted:
+            parts.append('(?P<_f>' + compile_words(self._formatted) + ')')
+
+        groups: int = len(parts)
+
+        for index, pattern in enumerate(self._patterns):
+            part, count = compile_rule(pattern, f'_r{index}', groups)
+            parts.append(part)
+            groups += count
+
+        self._regex: re.Pattern|None = re.compile('|'.join(parts)) if parts else None
+        self._rendered = None
+
+    def set_formatted(self, formatted: dict) -> None:
+        """
+        The task of this method is to change the formatted data and compile the regex again.
+
+        :param formatted: The formatted data of the prompt.
+        :return: None
+        """
+
+        self._formatted = formatted
+        self._compile()
+
+    def reset(self, text: str="") -> None:
+        """
+        The task of this method is to set the whole text that is highlighted.
+
+        :param text: The new user's input string.
+        :return: None
+        """
+
+        self._text = text
+        self._rendered = None
+
+    def edit(self, buffer: TextBuffer, start: int, end: int, length: int) -> None:
+        """
+        The task of this method is to update the text after an edit of the user's input string.
+        The text is highlighted again on the next render.
+
+        :param buffer: The text buffer after the edit.
+        :param start: The start index of the edit.
+        :param end: The end index of the replaced text (before the edit).
+        :param length: The length of the new text that is inserted at the start index.
+        :return: None
+        """
+
+        self.reset(buffer.__str__())
+
+    def render(self) -> str:
+        """
+        The task of this method is to return the highlighted user's input string.
+        The text is scanned once with the compiled regex and the result is kept until the next edit.
+
+        :return: str
+        """
+
+        if self._rendered is not None:
+            return self._rendered
+
+        if self._regex is None:
+            self._rendered = self._text
+            return self._rendered
+
+        output: list = []
+        position: int = 0
+
+        for match in self._regex.finditer(self._text):
+            if match.start() == match.end():
+                continue
+
+            output.append(self._text[position:match.start()])
+
+            if match.lastgroup == '_f':
+                output.append(self._formatted[match.group()])
+            else:
+                output.append(self._rules[int(match.lastgroup[2:])] + match.group() + RESET)
+
+            position = match.end()
+
+        output.append(self._text[position:])
+        self._rendered = ''.join(output)
+
+        return self._rendered
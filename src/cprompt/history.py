@@ -0,0 +1,203 @@
+"""
+ ██████╗██████╗ ██████╗  ██████╗ ███╗   ███╗██████╗ ████████╗
+██╔════╝██╔══██╗██╔══██╗██╔═══██╗████╗ ████║██╔══██╗╚══██╔══╝
+██║     ██████╔╝██████╔╝██║   ██║██╔████╔██║██████╔╝   ██║
+██║     ██╔═══╝ ██╔══██╗██║   ██║██║╚██╔╝██║██╔═══╝    ██║
+╚██████╗██║     ██║  ██║╚██████╔╝██║ ╚═╝ ██║██║        ██║
+ ╚═════╝╚═╝     ╚═╝  ╚═╝ ╚═════╝ ╚═╝     ╚═╝╚═╝        ╚═╝
+
+cprompt is a package for creating live and customized one-line prompts that can
+be used to manage and personalize input from the user in the terminal (bash) environment.
+
+cprompt Github repository: https://github.com/mimseyedi/cprompt
+
+
+This file is related to the command history of the prompts.
+The History keeps the entries in an append-only text file (one entry per line) that is
+memory-mapped when it is opened. Instead of loading every line as a Python string, it keeps
+a compact array of the offsets where the lines end, so any entry is decoded in O(1) directly
+from the mapped file when it is needed (for example, when the user presses UP or DOWN).
+
+Several processes can share the same history file: each entry is appended with a single write
+while the file is locked with flock, and the new lines of the other processes are indexed
+the next time the history is refreshed.
+"""
+
+
+import os
+import re
+import mmap
+import fcntl
+from array import array
+
+
+_ESCAPE_REGEX = re.compile(r'\\(.)', re.DOTALL)
+
+
+def _escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _unescape(text: str) -> str:
+    if '\\' not in text:
+        return text
+
+    return _ESCAPE_REGEX.sub(lambda match: '\n' if match.group(1) == 'n' else match.group(1), text)
+
+
+class History:
+    """
+    A persistent command history backed by an append-only file.
+    """
+
+    def __init__(self, path: str, ignore_duplicates: bool=True):
+        if not isinstance(path, (str, os.PathLike)):
+            raise TypeError(
+                f'The type of path argument must be string or path-like, but received "{type(path)}".'
+            )
+
+        self.path: str = os.fspath(path)
+        self.ignore_duplicates: bool = ignore_duplicates
+        self._fd: int = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+        self._map: mmap.mmap|None = None
+        self._ends: array = array('Q')
+        self._indexed: int = 0
+
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        The task of this method is to index the lines that were appended to the file since the last refresh
+        (by this process or by another one). The file is mapped again only if it has grown.
+        If the file was truncated or rewritten in the meantime, the old map is released and the whole
+        file is indexed again, so no entry is ever read from beyond the end of the file.
+
+        :return: None
+        """
+
+        size: int = os.fstat(self._fd).st_size
+
+        if size < self._indexed or (self._indexed and os.pread(self._fd, 1, self._indexed - 1) != b'\n'):
+            self._reset()
+
+        if size <= self._indexed:
+            return
+
+        if self._map is None or len(self._map) < size:
+            if self._map is not None:
+                self._map.close()
+
+            self._map = mmap.mmap(self._fd, size, access=mmap.ACCESS_READ)
+
+        mapped: mmap.mmap = self._map
+        position: int = mapped.find(b'\n', self._indexed, size)
+
+        while position != -1:
+            self._ends.append(position)
+            position = mapped.find(b'\n', position + 1, size)
+
+        if self._ends:
+            self._indexed = self._ends[-1] + 1
+
+    def _reset(self) -> None:
+        """
+        The task of this method is to forget the index and the map of the file.
+
+        :return: None
+        """
+
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+        self._ends = array('Q')
+        self._indexed = 0
+
+    def append(self, text: str) -> None:
+        """
+        The task of this method is to add an entry to the end of the history.
+        Empty entries (and, with ignore_duplicates, the same entry as the last one) are not added.
+        The line is written with one system call while the file is locked, so the appends of
+        several processes never interleave.
+
+        :param text: The new entry.
+        :return: None
+        """
+
+        if not isinstance(text, str):
+            raise TypeError(
+                f'The type of text argument must be string, but received "{type(text)}".'
+            )
+
+        if not text.strip():
+            return
+
+        line: bytes = (_escape(text) + '\n').encode('utf-8')
+
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+        try:
+            self.refresh()
+
+            if self.ignore_duplicates and len(self) and self[-1] == text:
+                return
+
+            if os.fstat(self._fd).st_size > self._indexed:
+                # A process that died while appending left an unterminated line at the end of the file;
+                # it is closed here so that it is not glued onto this entry.
+                line = b'\n' + line
+
+            written: int = 0
+
+            while written < len(line):
+                written += os.write(self._fd, line[written:])
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+        self.refresh()
+
+    def close(self) -> None:
+        """
+        The task of this method is to release the mapped file and its file descriptor.
+
+        :return: None
+        """
+
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def __getitem__(self, index: int) -> str:
+        if not isinstance(index, int):
+            raise TypeError(
+                f'History indices must be integers, but received "{type(index)}".'
+            )
+
+        if index < 0:
+            index += len(self._ends)
+
+        if 0 <= index < len(self._ends) and self._ends[index] >= os.fstat(self._fd).st_size:
+            self.refresh()
+
+        if not 0 <= index < len(self._ends):
+            raise IndexError('The history index is out of range.')
+
+        start: int = self._ends[index - 1] + 1 if index else 0
+
+        return _unescape(self._map[start:self._ends[index]].decode('utf-8', errors='replace'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(path={self.path!r}, entries={len(self)})'
@@ -14,16 +14,31 @@ cprompt Github repository: https://github.com/mimseyedi/cprompt
 This file is related to keyboard keys and their special codes in low level style.
 In this file, there are specified keys in the KEYS constant, which can be read from
 the keyboard to the terminal with the help of two functions, readkey and getchar.
+The AsyncKeyReader reads the same keys inside an asyncio event loop without blocking it.
 
 For more information:
 https://stackoverflow.com/questions/64035952/how-to-key-press-detection-on-a-linux-terminal-low-level-style-in-python
 """
 
 
+import os
 import sys
 import tty
+import time
+import asyncio
+import signal
 import termios
-from ansi import ESC, CSI
+import threading
+from contextlib import contextmanager
+from ansi import (
+    ESC,
+    CSI,
+    CURSOR_POSITION_TIMEOUT,
+    send_cursor_position_request,
+    take_cursor_position_reply,
+)
+from reader import InputReader, get_reader
+from errors import ReadCursorPositionError
 
 
 KEYS: dict = {
@@ -75,89 +90,559 @@ KEYS: dict = {
     'ctrl-]'     : '\x1d',
 }
 
+# The markers that the terminal puts around pasted text in bracketed paste mode
+PASTE_START: str = ESC + CSI + '200~'
+PASTE_END: str = ESC + CSI + '201~'
+
+# The time in seconds to wait for the rest of an escape sequence before ESC is decoded as ESCAPE.
+ESCAPE_TIMEOUT: float = 0.1
+
+# Xterm modifier parameters of escape sequences (CSI 1;<modifier><final>)
+MODIFIERS: dict = {
+    '2': 'SHIFT+',
+    '3': 'ALT+',
+    '4': 'ALT+SHIFT+',
+    '5': 'CTRL+',
+    '6': 'CTRL+SHIFT+',
+    '7': 'CTRL+ALT+',
+    '8': 'CTRL+ALT+SHIFT+',
+}
+
+
+def _build_sequences() -> dict:
+    """
+    The task of this function is to generate the table of escape sequences and their key names.
+    The table contains the CSI and SS3 forms of the cursor keys, the editing keys, the F-keys
+    and all of their xterm modifier combinations.
+
+    :return: dict
+    """
+
+    letter_keys: dict = {
+        'A': 'UP',
+        'B': 'DOWN',
+        'C': 'RIGHT',
+        'D': 'LEFT',
+        'H': 'HOME',
+        'F': 'END',
+        'P': 'F1',
+        'Q': 'F2',
+        'R': 'F3',
+        'S': 'F4',
+    }
+    tilde_keys: dict = {
+        '1': 'HOME',
+        '2': 'INSERT',
+        '3': 'DELETE',
+        '4': 'END',
+        '5': 'PAGE_UP',
+        '6': 'PAGE_DOWN',
+        '7': 'HOME',
+        '8': 'END',
+        '11': 'F1',
+        '12': 'F2',
+        '13': 'F3',
+        '14': 'F4',
+        '15': 'F5',
+        '17': 'F6',
+        '18': 'F7',
+        '19': 'F8',
+        '20': 'F9',
+        '21': 'F10',
+        '23': 'F11',
+        '24': 'F12',
+    }
+
+    sequences: dict = {
+        ESC: 'ESCAPE',
+        ESC + CSI + 'Z': 'SHIFT+TAB',
+        PASTE_START: 'PASTE',
+    }
+
+    for final, name in letter_keys.items():
+        sequences[ESC + CSI + final] = name
+        sequences[ESC + 'O' + final] = name
+
+        for modifier, prefix in MODIFIERS.items():
+            sequences[ESC + CSI + '1;' + modifier + final] = prefix + name
+
+    for number, name in tilde_keys.items():
+        sequences[ESC + CSI + number + '~'] = name
+
+        for modifier, prefix in MODIFIERS.items():
+            sequences[ESC + CSI + number + ';' + modifier + '~'] = prefix + name
+
+    return sequences
+
+
+def _build_trie(sequences: dict) -> dict:
+    """
+    The task of this function is to build a trie from a table of escape sequences.
+    Each node is a dictionary from the next character to the child node,
+    and the name of a complete sequence is stored under the None key of its node.
+
+    :param sequences: A dictionary of escape sequences and their key names.
+    :return: dict
+    """
+
+    trie: dict = {}
+
+    for sequence, name in sequences.items():
+        node: dict = trie
+        for char in sequence:
+            node = node.setdefault(char, {})
+        node[None] = name
+
+    return trie
+
+
+SEQUENCES: dict = _build_sequences()
+SEQUENCE_TRIE: dict = _build_trie(SEQUENCES)
+
+# Single control characters and their key names (for example '\x7f' -> 'BACKSPACE')
+CHARS: dict = {
+    value: key.upper()
+    for key, value in reversed(KEYS.items())
+    if len(value) == 1 and (not value.isprintable() or value == ' ')
+}
+
+
+# The file descriptor that is currently in a raw mode session (None if there is no session).
+_raw_fd: int|None = None
+
+
+def _make_raw(attr: list) -> list:
+    """
+    The task of this function is to build raw terminal attributes from the current ones.
+    Unlike tty.setraw, output post-processing is kept so that a new line still returns the carriage.
+
+    :param attr: The current terminal attributes (the result of termios.tcgetattr).
+    :return: list
+    """
+
+    raw: list = [*attr[:tty.CC], list(attr[tty.CC])]
+
+    raw[tty.IFLAG] &= ~(termios.BRKINT | termios.ICRNL | termios.INPCK | termios.ISTRIP | termios.IXON)
+    raw[tty.CFLAG] = (raw[tty.CFLAG] & ~(termios.CSIZE | termios.PARENB)) | termios.CS8
+    raw[tty.LFLAG] &= ~(termios.ECHO | termios.ICANON | termios.IEXTEN | termios.ISIG)
+    raw[tty.CC][termios.VMIN] = 1
+    raw[tty.CC][termios.VTIME] = 0
+
+    return raw
+
+
+@contextmanager
+def raw_mode(fd: int=None):
+    """
+    The task of this function is to put the terminal in raw mode once for a whole prompt session
+    and restore it at the end, even if an exception is raised or the process receives
+    SIGTERM or SIGHUP. While the session is active, getchar reads without toggling the terminal mode.
+    Nested sessions on the same file descriptor reuse the outer one.
+
+    :param fd: The file descriptor of the terminal (standard input by default).
+    :return: None
+    """
+
+    global _raw_fd
+
+    if fd is None:
+        fd = sys.stdin.fileno()
+
+    if _raw_fd == fd:
+        yield
+        return
+
+    attr: list = termios.tcgetattr(fd)
+    raw: list = _make_raw(attr)
+    previous_handlers: dict = {}
+
+    def restore_and_forward(signum, frame) -> None:
+        termios.tcsetattr(fd, termios.TCSANOW, attr)
+        handler = previous_handlers[signum]
+
+        if callable(handler):
+            handler(signum, frame)
+            termios.tcsetattr(fd, termios.TCSANOW, raw)
+        elif handler == signal.SIG_IGN:
+            termios.tcsetattr(fd, termios.TCSANOW, raw)
+        else:
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+
+    if threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGTERM, signal.SIGHUP):
+            previous_handlers[signum] = signal.signal(signum, restore_and_forward)
+
+    try:
+        termios.tcsetattr(fd, termios.TCSANOW, raw)
+        _raw_fd = fd
+        yield
+    finally:
+        _raw_fd = None
+        termios.tcsetattr(fd, termios.TCSANOW, attr)
+
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+
 
 def getchar() -> str:
     """
     The task of this function is to read a character from the input entered in the terminal.
     This function will return the character read from the terminal in the form of a string of length one.
 
+    Characters are taken from the buffered reader of the terminal, which drains all the available
+    bytes with one system call. Inside a raw_mode session the character is read directly,
+    otherwise the terminal is put in raw mode only when the reader has to wait for new input.
+
     :return: str
     """
 
     fd: int = sys.stdin.fileno()
+    reader: InputReader = get_reader(fd)
+
+    if _raw_fd == fd or reader.buffered():
+        return reader.getchar()
+
     attr: list = termios.tcgetattr(fd)
 
     try:
         tty.setraw(fd)
-        return sys.stdin.read(1)
+        return reader.getchar()
     finally:
         termios.tcsetattr(fd, termios.TCSANOW, attr)
 
 
-def readkey() -> str:
+class Paste(str):
+    """
+    A pasted text that is read as a single event in bracketed paste mode.
+    The value of the string is the pasted text without the paste markers.
     """
-    The task of this function is to read the key pressed by the user with the help of the getchar function.
-    This function connects the entered input to the corresponding keys and finally returns the name of the entered key.
 
-    :return: str
+
+def decode(text: str, final: bool=False) -> tuple[str|None, int]:
+    """
+    The task of this function is to decode the first key of a buffered input.
+    Escape sequences are resolved by walking the SEQUENCE_TRIE, so each key is found
+    in O(sequence length) with one dictionary lookup per character.
+    Unrecognized CSI and SS3 sequences are consumed completely and decoded as None.
+    A bracketed paste is decoded as one Paste object once its end marker has arrived,
+    and until then the key is 'PASTE' with 0 consumed characters (see wait_paste).
+
+    :param text: The buffered characters of the input.
+    :param final: Is no more input expected? (For example, after the escape timeout.)
+    :return: tuple[str|None, int] (the key and the number of consumed characters;
+             0 characters means that more input is needed)
     """
 
-    char: str = getchar()
-
-    if char == ESC:
-        if getchar() == CSI:
-            _ = getchar()
-            if _ == '1':
-                if getchar() == ';':
-                    if getchar() == '2':
-                        _ = getchar()
-                        match _:
-                            case 'C':
-                                return 'SHIFT+RIGHT'
-                            case 'D':
-                                return 'SHIFT+LEFT'
-            elif _ == '2':
-                if getchar() == '~':
-                    return 'INSERT'
-            elif _ == '3':
-                if getchar() == '~':
-                    return 'DELETE'
-            elif _ == '5':
-                return 'PAGE_UP'
-            elif _ == '6':
-                return 'PAGE_DOWN'
-
-            elif _ == 'H':
-                return 'HOME'
-            elif _ == 'F':
-                return 'END'
-            elif _ == 'A':
-                return 'UP'
-            elif _ == 'B':
-                return 'DOWN'
-            elif _ == 'C':
-                return 'RIGHT'
-            elif _ == 'D':
-                return 'LEFT'
+    if not text:
+        return None, 0
+
+    char: str = text[0]
+
+    if char != ESC:
+        return CHARS.get(char, char), 1
+
+    node: dict = SEQUENCE_TRIE
+    index: int = 0
+
+    while index < len(text):
+        child: dict|None = node.get(text[index])
+
+        if child is None:
+            break
+
+        node = child
+        index += 1
+
+        if None in node and len(node) == 1:
+            if node[None] == 'PASTE':
+                end: int = text.find(PASTE_END, index)
+
+                if end == -1:
+                    return 'PASTE', 0
+
+                return Paste(text[index:end]), end + len(PASTE_END)
+
+            return node[None], index
     else:
-        if char == KEYS.get('escape'):
-            return 'ESCAPE'
-        elif char == KEYS.get('backspace'):
-            return 'BACKSPACE'
-        elif char == KEYS.get('enter'):
-            return 'ENTER'
-        elif char == KEYS.get('tab'):
-            return 'TAB'
-        else:
-            for key, value in KEYS.items():
-                if char == value and char not in (
-                    'A',
-                    'B',
-                    'C',
-                    'D',
-                    'H',
-                    'F',
-                ):
-                    return key.upper()
-
-        return char
\ No newline at end of file
+        if not final:
+            return None, 0
+
+        if None in node:
+            return node[None], index
+
+    if index == 1:
+        if text[1] == ESC:
+            return 'ESCAPE', 1
+
+        return 'ALT+' + text[1], 2
+
+    if text[1] == CSI:
+        for index in range(2, len(text)):
+            code: int = ord(text[index])
+
+            if 0x40 <= code <= 0x7e:
+                return None, index + 1
+
+            if code < 0x20:
+                return None, index
+
+        return None, len(text) if final else 0
+
+    return None, min(len(text), 3) if final or len(text) >= 3 else 0
+
+
+def _remaining(deadline: float|None) -> float|None:
+    """
+    The task of this function is to return the waiting time that is left until a deadline.
+
+    :param deadline: A time of time.monotonic (None means no deadline).
+    :return: float|None (None if there is no deadline)
+    """
+
+    return None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+
+def wait_paste(reader: InputReader, deadline: float|None) -> bool:
+    """
+    The task of this function is to wait until the end marker of a bracketed paste has arrived.
+    Only the new input is searched for the marker after each read (see InputReader.find),
+    so a large paste is not decoded again for every chunk that arrives.
+
+    :param reader: The input reader whose buffer starts with an unfinished paste.
+    :param deadline: The time (of time.monotonic) when the wait ends, or None.
+    :return: bool (False if the deadline passed first)
+    """
+
+    while reader.find(PASTE_END) == -1:
+        if not reader.fill(_remaining(deadline)) and deadline is not None:
+            return False
+
+    return True
+
+
+def readkey(timeout: float|None=None) -> str|None:
+    """
+    The task of this function is to read the key pressed by the user with the help of the buffered reader.
+    This function connects the entered input to the corresponding keys and finally returns the name of the entered key.
+
+    A lone ESC is only decoded as ESCAPE if no other character arrives within ESCAPE_TIMEOUT seconds.
+    A bracketed paste is returned as a single Paste object.
+    If a watched file descriptor of the reader wakes up the wait before a key arrives,
+    the name of its event (like 'RESIZE') is returned instead, and if no key arrives
+    within the timeout, 'TIMEOUT' is returned. The waits are select calls, so nothing is polled.
+
+    :param timeout: The maximum waiting time in seconds (None means waiting without a limit).
+    :return: str|None (None for unrecognized escape sequences)
+    """
+
+    reader: InputReader = get_reader(sys.stdin.fileno())
+    deadline: float|None = None if timeout is None else time.monotonic() + timeout
+
+    with raw_mode(reader.fd):
+        if not reader.buffered() and not reader.fill(timeout, wakeup=True):
+            event: str|None = reader.next_event()
+            return 'TIMEOUT' if event is None else event
+
+        while True:
+            key, consumed = decode(reader.peek())
+
+            if consumed:
+                reader.consume(consumed)
+                return key
+
+            if key == 'PASTE':
+                if not wait_paste(reader, deadline):
+                    return 'TIMEOUT'
+
+                continue
+
+            if not reader.fill(ESCAPE_TIMEOUT):
+                key, consumed = decode(reader.peek(), final=True)
+
+                if consumed:
+                    reader.consume(consumed)
+                    return key
+
+                if not reader.fill(_remaining(deadline)) and deadline is not None:
+                    return 'TIMEOUT'
+
+
+class AsyncKeyReader:
+    """
+    A key reader for asyncio applications. The file descriptor of the terminal is registered
+    with loop.add_reader, so the bytes are read when they arrive and the keys are decoded
+    without blocking the event loop. Other file descriptors can be registered as events
+    (like the self-pipe of a terminal resize), in the same way as InputReader.watch.
+    It must be used as a context manager inside a running event loop.
+    """
+
+    _stack: list = []
+
+    def __init__(self, reader: InputReader, events: dict=None):
+        self.reader: InputReader = reader
+        self.events: dict = dict(events or {})
+        self._ready: asyncio.Event = asyncio.Event()
+        self._queued: list = []
+        self._paused: dict = {}
+        self._error: BaseException|None = None
+        self._loop: asyncio.AbstractEventLoop|None = None
+
+    def _on_input(self) -> None:
+        try:
+            self.reader.fill(0)
+        except EOFError as error:
+            self._error = error
+            self._loop.remove_reader(self.reader.fd)
+
+        self._ready.set()
+
+    def _on_event(self, fd: int) -> None:
+        """
+        The task of this method is to queue the event of a readable file descriptor.
+        The file descriptor is paused until the next key is requested, since it stays
+        readable until the owner of the event drains it.
+
+        :param fd: The readable file descriptor.
+        :return: None
+        """
+
+        if self.events[fd] not in self._queued:
+            self._queued.append(self.events[fd])
+
+        self._loop.remove_reader(fd)
+        self._paused[fd] = self.events[fd]
+        self._ready.set()
+
+    def _register(self) -> None:
+        self._loop.add_reader(self.reader.fd, self._on_input)
+
+        for fd in self.events:
+            if fd not in self._paused:
+                self._loop.add_reader(fd, self._on_event, fd)
+
+    def _unregister(self) -> None:
+        self._loop.remove_reader(self.reader.fd)
+
+        for fd in self.events:
+            self._loop.remove_reader(fd)
+
+    def __enter__(self):
+        self._loop = asyncio.get_running_loop()
+
+        if AsyncKeyReader._stack:
+            AsyncKeyReader._stack[-1]._unregister()
+
+        AsyncKeyReader._stack.append(self)
+        self._register()
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._unregister()
+        AsyncKeyReader._stack.remove(self)
+
+        if AsyncKeyReader._stack:
+            AsyncKeyReader._stack[-1]._register()
+
+    async def wait(self, timeout: float|None=None) -> bool:
+        """
+        The task of this method is to wait until new input or an event arrives.
+
+        :param timeout: The maximum waiting time in seconds (None means waiting without a limit).
+        :return: bool (False if the timeout passed first)
+        """
+
+        self._ready.clear()
+
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+        return True
+
+    async def readkey(self, timeout: float|None=None) -> str|None:
+        """
+        The task of this method is to read the next key without blocking the event loop.
+        It follows readkey: a lone ESC is only decoded as ESCAPE after ESCAPE_TIMEOUT seconds,
+        a bracketed paste is returned as a single Paste object, the name of an event
+        is returned when the event arrives while no key is buffered and 'TIMEOUT' is returned
+        if no key arrives within the timeout.
+
+        :param timeout: The maximum waiting time in seconds (None means waiting without a limit).
+        :return: str|None (None for unrecognized escape sequences)
+        """
+
+        deadline: float|None = None if timeout is None else time.monotonic() + timeout
+
+        for fd in self._paused:
+            self._loop.add_reader(fd, self._on_event, fd)
+
+        self._paused.clear()
+
+        while True:
+            if self._queued and not self.reader.buffered():
+                return self._queued.pop(0)
+
+            key, consumed = decode(self.reader.peek())
+
+            if consumed:
+                self.reader.consume(consumed)
+                return key
+
+            if self._error is not None:
+                raise self._error
+
+            if key == 'PASTE':
+                while self.reader.find(PASTE_END) == -1:
+                    if not await self.wait(_remaining(deadline)) and deadline is not None:
+                        return 'TIMEOUT'
+
+                    if self._error is not None:
+                        raise self._error
+
+                continue
+
+            if not self.reader.buffered():
+                if not await self.wait(_remaining(deadline)) and deadline is not None:
+                    return 'TIMEOUT'
+
+                continue
+
+            if await self.wait(ESCAPE_TIMEOUT):
+                continue
+
+            key, consumed = decode(self.reader.peek(), final=True)
+
+            if consumed:
+                self.reader.consume(consumed)
+                return key
+
+            if not await self.wait(_remaining(deadline)) and deadline is not None:
+                return 'TIMEOUT'
+
+
+async def get_cursor_position_async(timeout: float=CURSOR_POSITION_TIMEOUT) -> tuple[int, int]:
+    """
+    The task of this function is to request the cursor position from the terminal like
+    get_cursor_position (in ansi), but the reply is awaited through an AsyncKeyReader,
+    so the running asyncio event loop is not blocked while the terminal answers.
+
+    :param timeout: The maximum waiting time for the reply of the terminal in seconds.
+    :return: tuple[int, int]
+    """
+
+    reader: InputReader = get_reader(sys.stdin.fileno())
+
+    with raw_mode(reader.fd), AsyncKeyReader(reader) as keys:
+        typed_before: int = send_cursor_position_request(reader)
+        deadline: float = time.monotonic() + timeout
+
+        while (position := take_cursor_position_reply(reader, typed_before)) is None:
+            if not await keys.wait(_remaining(deadline)):
+                raise ReadCursorPositionError(
+                    f'The terminal did not report the cursor position within {timeout} seconds.'
+                )
+
+    return position
@@ -0,0 +1,353 @@
+"""
+ ██████╗██████╗ ██████╗  ██████╗ ███╗   ███╗██████╗ ████████╗
+██╔════╝██╔══██╗██╔══██╗██╔═══██╗████╗ ████║██╔══██╗╚══██╔══╝
+██║     ██████╔╝██████╔╝██║   ██║██╔████╔██║██████╔╝   ██║
+██║     ██╔═══╝ ██╔══██╗██║   ██║██║╚██╔╝██║██╔═══╝    ██║
+╚██████╗██║     ██║  ██║╚██████╔╝██║ ╚═╝ ██║██║        ██║
+ ╚═════╝╚═╝     ╚═╝  ╚═╝ ╚═════╝ ╚═╝     ╚═╝╚═╝        ╚═╝
+
+cprompt is a package for creating live and customized one-line prompts that can
+be used to manage and personalize input from the user in the terminal (bash) environment.
+
+cprompt Github repository: https://github.com/mimseyedi/cprompt
+
+This file is related to syntax highlighting of the user's input string with stateful lexers.
+A Lexer splits the input into styled tokens and reports its state after each token.
+The LexerHighlighter records these states at the token boundaries, so after an edit it resumes
+lexing from the nearest saved state before the edit, reads only a window of the input after it,
+and stops as soon as the lexer reaches a boundary of the old tokens with the same state again.
+The tokens are given to the renderer as style spans instead of pre-formatted strings, and only
+the spans that changed are drawn again.
+"""
+
+
+import re
+from typing import Iterator, NamedTuple
+from abc import ABC, abstractmethod
+from buffer import TextBuffer
+from prefix import PrefixSums
+from ansi import (
+    RESET,
+    BOLD,
+    FG_RED,
+    FG_CYAN,
+    FG_GREEN,
+    FG_YELLOW,
+    FG_MAGENTA,
+)
+
+
+class Token(NamedTuple):
+    """
+    A styled part of the user's input string and the state of the lexer after it.
+    """
+
+    start: int
+    end: int
+    style: str
+    state: object
+
+
+class Lexer(ABC):
+    """
+    A basic lexer that all lexers are based on.
+    The states of a lexer must be comparable with '==' so that the highlighter can find
+    the point where lexing converges with the old tokens again.
+    """
+
+    initial_state: object = None
+
+    @abstractmethod
+    def lex(self, text: str, start: int, state: object) -> Iterator[Token]:
+        """
+        The task of this method is to yield the tokens of the text from the start index
+        to the end of the text. The tokens must be contiguous and not empty.
+
+        :param text: The user's input string, or a part of it that starts at a token boundary.
+                     A part may end before the input does; the tokens that reach its end are
+                     lexed again with a longer part, so a token may only depend on the characters
+                     up to the one after it.
+        :param start: The index where lexing starts (always a boundary of a previous token).
+        :param state: The state of the lexer at the start index.
+        :return: Iterator[Token]
+        """
+
+
+class ShellLexer(Lexer):
+    """
+    A lexer for shell-like command lines that highlights commands, keywords, quoted strings,
+    numbers, flags and operators.
+
+    The state of this lexer is 'command' when the next word is a command, 'argument' when it is
+    an argument, or a quote character when the lexer is inside an unterminated quoted string.
+    """
+
+    initial_state: str = 'command'
+
+    KEYWORDS: tuple = (
+        'if', 'then', 'else', 'elif', 'fi', 'for', 'while', 'until',
+        'do', 'done', 'case', 'esac', 'in', 'function', 'time', '!',
+    )
+
+    STYLES: dict = {
+        'command': BOLD,
+        'keyword': FG_MAGENTA,
+        'string': FG_GREEN,
+        'number': FG_CYAN,
+        'flag': FG_YELLOW,
+        'operator': FG_RED,
+        'argument': '',
+        'space': '',
+    }
+
+    _TOKEN_REGEX = re.compile(
+        r'(?P<space>\s+)'
+        r'|(?P<operator>&&|\|\||[|;&<>()])'
+        r'|(?P<quote>["\'])'
+        r'|(?P<number>[+-]?\d+(?:\.\d+)?(?![^\s|;&<>()]))'
+        r'|(?P<flag>--?[^\s|;&<>()"\']+)'
+        r'|(?P<word>[^\s|;&<>()"\']+)'
+    )
+
+    def __init__(self, styles: dict=None, keywords: tuple=None):
+        self.styles: dict = {**self.STYLES, **(styles or {})}
+        self.keywords: frozenset = frozenset(self.KEYWORDS if keywords is None else keywords)
+
+    def lex(self, text: str, start: int, state: object) -> Iterator[Token]:
+        position: int = start
+        styles: dict = self.styles
+
+        while position < len(text):
+            if state in ('"', "'"):
+                end: int = text.find(state, position)
+
+                if end == -1:
+                    yield Token(position, len(text), styles['string'], state)
+                    return
+
+                yield Token(position, end + 1, styles['string'], 'argument')
+                position, state = end + 1, 'argument'
+                continue
+
+            match: re.Match = self._TOKEN_REGEX.match(text, position)
+            kind: str = match.lastgroup
+            end: int = match.end()
+
+            if kind == 'quote':
+                state = match.group()
+                closing: int = text.find(state, end)
+
+                if closing == -1:
+                    yield Token(position, len(text), styles['string'], state)
+                    return
+
+                end, state = closing + 1, 'argument'
+                kind = 'string'
+
+            elif kind == 'operator':
+                state = 'command'
+
+            elif kind == 'word':
+                if match.group() in self.keywords:
+                    kind = 'keyword'
+                elif state == 'command':
+                    kind, state = 'command', 'argument'
+                else:
+                    kind = 'argument'
+
+            elif kind in ('number', 'flag'):
+                state = 'argument'
+
+            yield Token(position, end, styles[kind], state)
+            position = end
+
+
+class LexerHighlighter:
+    """
+    An incremental highlighter that styles the user's input string with a Lexer.
+    """
+
+    WINDOW: int = 256
+
+    def __init__(self, lexer: Lexer):
+        self.lexer: Lexer = lexer
+        self._source: TextBuffer|str = ""
+        self._lengths: PrefixSums = PrefixSums()
+        self._styles: list = []
+        self._states: list = []
+        self._damage: tuple|None = (0, 0)
+        self._taken: int = 0
+
+    def _slice(self, start: int, end: int) -> str:
+        if isinstance(self._source, str):
+            return self._source[start:end]
+
+        return self._source.slice(start, end)
+
+    def set_formatted(self, formatted: dict) -> None:
+        """
+        The formatted data is not used by the lexer (the styles of the lexer are used instead).
+
+        :param formatted: The formatted data of the prompt.
+        :return: None
+        """
+
+    def reset(self, text: str="") -> None:
+        """
+        The task of this method is to lex a whole text from the beginning.
+
+        :param text: The new user's input string.
+        :return: None
+        """
+
+        self._source = text
+        self._styles, self._states = [], []
+        lengths: list = []
+
+        for token in self.lexer.lex(text, 0, self.lexer.initial_state):
+            lengths.append(token.end - token.start)
+            self._styles.append(token.style)
+            self._states.append(token.state)
+
+        self._lengths.reset(lengths)
+        self._damage = (0, 0)
+
+    def edit(self, buffer: TextBuffer, start: int, end: int, length: int) -> None:
+        """
+        The task of this method is to update the tokens after an edit of the user's input string.
+        Lexing resumes from the last token boundary before the edit with the state that was saved there,
+        and stops at the first new boundary after the edit that matches an old boundary with the same state.
+        Only a window of the buffer after the edit is read; the window is doubled while lexing reaches
+        its end, so the cost of an edit follows the length of the tokens that change.
+
+        :param buffer: The text buffer after the edit.
+        :param start: The start index of the edit.
+        :param end: The end index of the replaced text (before the edit).
+        :param length: The length of the new text that is inserted at the start index.
+        :return: None
+        """
+
+        self._source = buffer
+
+        if not self._styles:
+            self.reset(buffer.__str__())
+            self._source = buffer
+            return
+
+        length_before: int = self._lengths.total
+        delta: int = length - (end - start)
+
+        first: int = min(self._lengths.find(max(start - 1, 0)), len(self._styles) - 1)
+        state: object = self._states[first - 1] if first else self.lexer.initial_state
+        origin: int = self._lengths.prefix(first)
+        window_end: int = min(start + length + self.WINDOW, len(buffer))
+
+        while True:
+            text: str = buffer.slice(origin, window_end)
+            partial: bool = window_end < len(buffer)
+            lengths: list = []
+            styles: list = []
+            states: list = []
+            last: int = len(self._styles)
+            complete: bool = not partial
+
+            for token in self.lexer.lex(text, 0, state):
+                # A token that reaches the end of the window may continue after it.
+                if partial and token.end == len(text):
+                    break
+
+                lengths.append(token.end - token.start)
+                styles.append(token.style)
+                states.append(token.state)
+
+                old_end: int = origin + token.end - delta
+
+                if old_end >= end:
+                    index: int = self._lengths.find(old_end)
+
+                    if index > first and self._lengths.prefix(index) == old_end and self._states[index - 1] == token.state:
+                        last = index
+                        complete = True
+                        break
+
+            if complete:
+                break
+
+            window_end = min(origin + (window_end - origin) * 2, len(buffer))
+
+        region_end: int = self._lengths.prefix(last)
+
+        self._lengths.splice(first, last, lengths)
+        self._styles[first:last] = styles
+        self._states[first:last] = states
+
+        if self._damage is None:
+            self._damage = (origin, length_before - region_end)
+        else:
+            self._damage = (min(self._damage[0], origin), min(self._damage[1], length_before - region_end))
+
+    def take_damage(self) -> tuple|None:
+        """
+        The task of this method is to return the part of the text that has changed since the last call
+        and to start recording the changes again. The changed part always starts and ends at token
+        boundaries, and everything outside it is styled exactly as before.
+
+        :return: tuple[int, int, int]|None (the start of the changed part, its end before the changes
+                 and its end after the changes, or None if nothing has changed)
+        """
+
+        damage: tuple|None = self._damage
+        taken: int = self._taken
+
+        self._damage = None
+        self._taken = self._lengths.total
+
+        if damage is None:
+            return None
+
+        return damage[0], taken - damage[1], self._lengths.total - damage[1]
+
+    @property
+    def isolated(self) -> bool:
+        """
+        A getter method to check if the style of every token ends with the token.
+        The tokens are given to the renderer as style spans, so this is always the case.
+
+        :return: bool
+        """
+
+        return True
+
+    def segments(self, start: int=0, end: int=None) -> list[tuple[str, str]]:
+        """
+        The task of this method is to return the style spans of the user's input string,
+        or of a part of it that starts and ends at token boundaries (see take_damage).
+
+        :param start: The start index of the part.
+        :param end: The end index of the part (exclusive, the end of the text by default).
+        :return: list[tuple[str, str]]
+        """
+
+        first: int = self._lengths.find(start) if start else 0
+        last: int = len(self._styles) if end is None else self._lengths.find(end)
+        text: str = self._slice(self._lengths.prefix(first), self._lengths.prefix(last))
+        spans: list = []
+        position: int = 0
+
+        for style, size in zip(self._styles[first:last], self._lengths.values(first, last)):
+            spans.append((style, text[position:position + size]))
+            position += size
+
+        return spans
+
+    def render(self) -> str:
+        """
+        The task of this method is to return the highlighted user's input string.
+
+        :return: str
+        """
+
+        return ''.join(
+            style + text + RESET if style else text
+            for style, text in self.segments()
+        )
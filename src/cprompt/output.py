@@ -0,0 +1,110 @@
+"""
+ ██████╗██████╗ ██████╗  ██████╗ ███╗   ███╗██████╗ ████████╗
+██╔════╝██╔══██╗██╔══██╗██╔═══██╗████╗ ████║██╔══██╗╚══██╔══╝
+██║     ██████╔╝██████╔╝██║   ██║██╔████╔██║██████╔╝   ██║
+██║     ██╔═══╝ ██╔══██╗██║   ██║██║╚██╔╝██║██╔═══╝    ██║
+╚██████╗██║     ██║  ██║╚██████╔╝██║ ╚═╝ ██║██║        ██║
+ ╚═════╝╚═╝     ╚═╝  ╚═╝ ╚═════╝ ╚═╝     ╚═╝╚═╝        ╚═╝
+
+cprompt is a package for creating live and customized one-line prompts that can
+be used to manage and personalize input from the user in the terminal (bash) environment.
+
+cprompt Github repository: https://github.com/mimseyedi/cprompt
+
+This file is related to writing the output of the prompts to the terminal.
+The Output backend assembles everything that belongs to a frame (the bell, cursor moves
+and the changed text) in a reusable bytearray and writes it to the file descriptor
+of the terminal with a single os.write when the frame is flushed.
+"""
+
+
+import os
+import sys
+
+
+class Output:
+    """
+    A buffered writer over the file descriptor of the terminal.
+    """
+
+    def __init__(self, fd: int):
+        self.fd: int = fd
+        self._buffer: bytearray = bytearray()
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def write(self, text: str) -> None:
+        """
+        The task of this method is to add a text to the current frame.
+
+        :param text: A string that may contain ANSI codes.
+        :return: None
+        """
+
+        self._buffer += text.encode('utf-8')
+
+    def pending(self) -> bool:
+        """
+        The task of this method is to check if the current frame has anything to be written.
+
+        :return: bool
+        """
+
+        return bool(self._buffer)
+
+    def flush(self) -> None:
+        """
+        The task of this method is to write the current frame to the terminal with one system call
+        (more only if the terminal accepts a part of it) and to empty the buffer for the next frame.
+        Anything that is still buffered in sys.stdout is flushed first to keep the order of the output.
+
+        :return: None
+        """
+
+        if not self._buffer:
+            return
+
+        sys.stdout.flush()
+
+        view: memoryview = memoryview(self._buffer)
+        written: int = 0
+
+        try:
+            while written < len(view):
+                written += os.write(self.fd, view[written:])
+        finally:
+            view.release()
+            del self._buffer[:]
+
+
+_outputs: dict = {}
+
+
+def stdout_fileno() -> int:
+    """
+    The task of this function is to return the file descriptor of the standard output.
+    If sys.stdout was replaced with an object that has no file descriptor (like io.StringIO
+    or a captured output in a notebook), the descriptor of the original standard output is used.
+
+    :return: int
+    """
+
+    try:
+        return sys.stdout.fileno()
+    except (AttributeError, OSError, ValueError):
+        return 1
+
+
+def get_output(fd: int) -> Output:
+    """
+    The task of this function is to return the shared output backend of a file descriptor.
+
+    :param fd: The file descriptor of the terminal.
+    :return: Output
+    """
+
+    if fd not in _outputs:
+        _outputs[fd] = Output(fd)
+
+    return _outputs[fd]
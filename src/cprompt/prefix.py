@@ -0,0 +1,265 @@
+"""
+ ██████╗██████╗ ██████╗  ██████╗ ███╗   ███╗██████╗ ████████╗
+██╔════╝██╔══██╗██╔══██╗██╔═══██╗████╗ ████║██╔══██╗╚══██╔══╝
+██║     ██████╔╝██████╔╝██║   ██║██╔████╔██║██████╔╝   ██║
+██║     ██╔═══╝ ██╔══██╗██║   ██║██║╚██╔╝██║██╔═══╝    ██║
+╚██████╗██║     ██║  ██║╚██████╔╝██║ ╚═╝ ██║██║        ██║
+ ╚═════╝╚═╝     ╚═╝  ╚═╝ ╚═════╝ ╚═╝     ╚═╝╚═╝        ╚═╝
+
+cprompt is a package for creating live and customized one-line prompts that can
+be used to manage and personalize input from the user in the terminal (bash) environment.
+
+cprompt Github repository: https://github.com/mimseyedi/cprompt
+
+
+This file is related to the prefix sums of the structures that follow the user's input
+(the widths of its characters, the lengths of its grapheme clusters and of its highlighted tokens).
+PrefixSums keeps the values in bounded blocks together with two Fenwick trees over the sums and the
+sizes of the blocks, so a prefix sum, a search by a sum and an edit that stays inside a block
+cost O(BLOCK_SIZE + log n) instead of rebuilding the prefix sums of the whole input.
+"""
+
+
+def _build_tree(values: list) -> list:
+    """
+    The task of this function is to build a Fenwick tree (1-indexed) over a list of values.
+
+    :param values: A list of non-negative integers.
+    :return: list
+    """
+
+    tree: list = [0] + values
+
+    for index in range(1, len(tree)):
+        parent: int = index + (index & -index)
+
+        if parent < len(tree):
+            tree[parent] += tree[index]
+
+    return tree
+
+
+def _add(tree: list, index: int, delta: int) -> None:
+    index += 1
+
+    while index < len(tree):
+        tree[index] += delta
+        index += index & -index
+
+
+def _query(tree: list, count: int) -> int:
+    total: int = 0
+
+    while count > 0:
+        total += tree[count]
+        count -= count & -count
+
+    return total
+
+
+def _search(tree: list, value: int) -> tuple[int, int]:
+    """
+    The task of this function is to find the largest number of leading values of a Fenwick tree
+    whose sum is not greater than a value.
+
+    :param tree: A Fenwick tree over non-negative integers.
+    :param value: The sum that is searched.
+    :return: tuple[int, int] (the number of values and their sum)
+    """
+
+    position: int = 0
+    total: int = 0
+    step: int = 1 << (len(tree) - 1).bit_length()
+
+    while step:
+        following: int = position + step
+
+        if following < len(tree) and total + tree[following] <= value:
+            position = following
+            total += tree[following]
+
+        step >>= 1
+
+    return position, total
+
+
+class PrefixSums:
+    """
+    A sequence of non-negative integers with fast prefix sums and edits.
+    """
+
+    BLOCK_SIZE: int = 64
+
+    def __init__(self, values=()):
+        self.reset(values)
+
+    def reset(self, values=()) -> None:
+        """
+        The task of this method is to replace all the values of the sequence.
+
+        :param values: An iterable of non-negative integers.
+        :return: None
+        """
+
+        values = list(values)
+        size: int = self.BLOCK_SIZE
+
+        self._blocks: list = [values[index:index + size] for index in range(0, len(values), size)]
+        self._length: int = len(values)
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._sums: list = _build_tree(list(map(sum, self._blocks)))
+        self._sizes: list = _build_tree(list(map(len, self._blocks)))
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        """
+        The task of this method is to find the block of an index and the index inside the block.
+        The end of the sequence belongs to the last block.
+
+        :param index: An index between 0 and the length of the sequence.
+        :return: tuple[int, int]
+        """
+
+        if index >= self._length:
+            return len(self._blocks) - 1, index - self._length + len(self._blocks[-1])
+
+        block, before = _search(self._sizes, index)
+
+        return block, index - before
+
+    def prefix(self, index: int) -> int:
+        """
+        The task of this method is to return the sum of the values before an index.
+
+        :param index: An index between 0 and the length of the sequence.
+        :return: int
+        """
+
+        if index <= 0:
+            return 0
+
+        if index >= self._length:
+            return self.total
+
+        block, offset = self._locate(index)
+
+        return _query(self._sums, block) + sum(self._blocks[block][:offset])
+
+    def find(self, value: int) -> int:
+        """
+        The task of this method is to return the largest index whose prefix sum is not greater than a value
+        (like bisect_right over the list of the prefix sums, minus one).
+
+        :param value: A sum.
+        :return: int
+        """
+
+        block, total = _search(self._sums, value)
+
+        if block == len(self._blocks):
+            return self._length
+
+        index: int = _query(self._sizes, block)
+
+        for item in self._blocks[block]:
+            total += item
+
+            if total > value:
+                break
+
+            index += 1
+
+        return index
+
+    def splice(self, start: int, end: int, values: list) -> None:
+        """
+        The task of this method is to replace the values between two indexes with other values.
+        An edit whose values fit into the blocks it touches only updates the trees,
+        and the trees are built again only when blocks are split, merged or removed.
+
+        :param start: The start index of the replaced values.
+        :param end: The end index of the replaced values (exclusive).
+        :param values: The new values.
+        :return: None
+        """
+
+        if not self._blocks:
+            self.reset(values)
+            return
+
+        first, first_offset = self._locate(start)
+        last, last_offset = self._locate(end)
+
+        if last_offset == 0 and last > first:
+            last -= 1
+            last_offset = len(self._blocks[last])
+
+        merged: list = self._blocks[first][:first_offset] + list(values) + self._blocks[last][last_offset:]
+        self._length += len(values) - (end - start)
+
+        count: int = last - first + 1
+
+        # The values are spread over the same blocks while they fit, so only the trees are updated.
+        if count <= len(merged) <= count * self.BLOCK_SIZE * 2:
+            for block in range(count):
+                values = merged[len(merged) * block // count:len(merged) * (block + 1) // count]
+                _add(self._sums, first + block, sum(values) - sum(self._blocks[first + block]))
+                _add(self._sizes, first + block, len(values) - len(self._blocks[first + block]))
+                self._blocks[first + block] = values
+
+            return
+
+        size: int = self.BLOCK_SIZE
+        self._blocks[first:last + 1] = [merged[index:index + size] for index in range(0, len(merged), size)]
+        self._rebuild()
+
+    def values(self, start: int, end: int):
+        """
+        The task of this method is to return the values between two indexes
+        without going through the values before them.
+
+        :param start: The start index.
+        :param end: The end index (exclusive).
+        :return: Iterator[int]
+        """
+
+        if start >= end:
+            return
+
+        block, offset = self._locate(start)
+        count: int = end - start
+
+        while count > 0 and block < len(self._blocks):
+            part: list = self._blocks[block][offset:offset + count]
+            yield from part
+            count -= len(part)
+            block, offset = block + 1, 0
+
+    @property
+    def total(self) -> int:
+        """
+        A getter method to get the sum of all the values.
+
+        :return: int
+        """
+
+        return _query(self._sums, len(self._blocks))
+
+    def __getitem__(self, index: int) -> int:
+        if not 0 <= index < self._length:
+            raise IndexError('The index is out of range.')
+
+        block, offset = self._locate(index)
+
+        return self._blocks[block][offset]
+
+    def __iter__(self):
+        for block in self._blocks:
+            yield from block
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({list(self)!r})'
@@ -13,16 +13,17 @@ cprompt Github repository: https://github.com/mimseyedi/cprompt
 """
 
 
-import os
-import sys
 from base import BaseCprompt
-from keys import KEYS, readkey
+from buffer import TextBuffer
+from keys import KEYS, get_cursor_position_async
 from ansi import (
-    NEW_LINE,
     ERASE_ENTIRE_LINE,
+    SAVE_CURSOR_POSITION,
+    RESTORE_CURSOR,
+    ENABLE_ALTERNATIVE_BUFFER,
+    DISABLE_ALTERNATIVE_BUFFER,
     move_cursor,
     get_cursor_position,
-    move_cursor_to_column,
 )
 from errors import (
     KeyNotRecognizedError,
@@ -40,11 +41,13 @@ class Cprompt(BaseCprompt):
         *,
         limit: int=None,
         conditions: tuple=None,
+        buffer: type[TextBuffer]=None,
     ):
         super().__init__(
             message,
             limit=limit,
             conditions=conditions,
+            buffer=buffer,
         )
 
     def _display(self, be_returned: bool=False) -> None|str:
@@ -55,30 +58,19 @@ class Cprompt(BaseCprompt):
         :return: None
         """
 
-        temp: str = self._text.replace(" ", " - ")
-
-        output: list = []
-        for word in temp.split():
-            if word in self._formatted.keys():
-                output.append(self._formatted[word])
-            else:
-                if word == '-':
-                    output.append(" ")
-                else:
-                    output.append(word)
-
-        sys.stdout.write(ERASE_ENTIRE_LINE)
-        sys.stdout.write(move_cursor_to_column(col=0))
-
         if be_returned:
-            return ''.join(output)
+            return self._format()
 
-        sys.stdout.write(
-            self.message + ''.join(output) + move_cursor_to_column(col=self._cursor+len(self.message)+1)
-        )
-        sys.stdout.flush()
+        self._render(self.message)
 
-    def prompt(self, conditions: tuple=None, pure_return: bool=True) -> str:
+    def prompt(
+        self,
+        conditions: tuple=None,
+        pure_return: bool=True,
+        *,
+        timeout: float=None,
+        idle_timeout: float=None,
+    ) -> str:
         """
         The task of this method is to get input from the user.
         This method reads the keyboard with the help of a set of methods of this class
@@ -89,7 +81,9 @@ class Cprompt(BaseCprompt):
 
         :param conditions: Conditions to be checked at the time of entry in the format of a tuple.
         :param pure_return: Is the actual value of the text returned or formatted?
-        :return: str
+        :param timeout: The maximum duration of the prompt in seconds (None means no limit).
+        :param idle_timeout: The maximum time between two keys in seconds (None means no limit).
+        :return: str (PromptTimeoutError, carrying the entered text, is raised when a timeout passes)
         """
 
         if conditions is None:
@@ -98,66 +92,40 @@ class Cprompt(BaseCprompt):
             if not isinstance(conditions, tuple):
                 raise TypeError
 
-        self._display()
-
-        while True:
-            key: str = readkey()
-            self._last_key: str = key
-            exit_status: bool = False
-
-            if conditions:
-                for func in conditions:
-                    try:
-                        self._returned_value = func(self)
-                    except SystemExit:
-                        exit_status = True
-                    except TypeError:
-                        raise Exception
-
-            if key not in self.ignored_keys:
-                match key:
-                    case 'ENTER':
-                        self._display()
-                        sys.stdout.write(NEW_LINE)
-                        break
-
-                    case 'BACKSPACE':
-                        self.remove()
-
-                    case 'RIGHT':
-                        self.move_cursor_right()
-
-                    case 'LEFT':
-                        self.move_cursor_left()
-
-                    case 'SPACE':
-                        self._write(" ")
-
-                    case _:
-                        special_keys: tuple = (
-                            'UP',
-                            'DOWN',
-                            'SHIFT+RIGHT',
-                            'SHIFT+LEFT',
-                            'ESCAPE',
-                            'TAB',
-                            'INSERT',
-                            'DELETE',
-                            'PAGE_UP',
-                            'PAGE_DOWN',
-                            'HOME',
-                            'END',
-                        )
-                        if key is not None:
-                            if not key.startswith('CTRL') and key not in special_keys:
-                                self._write(key)
-
-            self._display()
-
-            if exit_status:
-                sys.stdout.write(NEW_LINE)
-                sys.stdout.flush()
-                break
+        self._run(conditions, timeout, idle_timeout)
+
+        if pure_return:
+            return self._text
+
+        return self._display(be_returned=True)
+
+    async def prompt_async(
+        self,
+        conditions: tuple=None,
+        pure_return: bool=True,
+        *,
+        timeout: float=None,
+        idle_timeout: float=None,
+    ) -> str:
+        """
+        The task of this method is to get input from the user inside a running asyncio event loop.
+        It works like the prompt method, but the keyboard is read without blocking the event loop,
+        so other tasks keep running while the user types. Conditions can be coroutine functions.
+
+        :param conditions: Conditions to be checked at the time of entry in the format of a tuple.
+        :param pure_return: Is the actual value of the text returned or formatted?
+        :param timeout: The maximum duration of the prompt in seconds (None means no limit).
+        :param idle_timeout: The maximum time between two keys in seconds (None means no limit).
+        :return: str (PromptTimeoutError, carrying the entered text, is raised when a timeout passes)
+        """
+
+        if conditions is None:
+            conditions = self.conditions
+        else:
+            if not isinstance(conditions, tuple):
+                raise TypeError
+
+        await self._run_async(conditions, timeout, idle_timeout)
 
         if pure_return:
             return self._text
@@ -177,14 +145,39 @@ class HintPrompt(BaseCprompt):
         *,
         limit: int=None,
         conditions: tuple=None,
+        buffer: type[TextBuffer]=None,
     ):
         super().__init__(
             message,
             limit=limit,
             conditions=conditions,
+            buffer=buffer,
         )
-        if isinstance(hint, str):
-            self.hint = hint
+        self.hint = hint
+
+    @property
+    def hint(self) -> str:
+        """
+        A getter method to get the hint that is displayed while the input is empty.
+
+        :return: str
+        """
+
+        return self._hint
+
+    @hint.setter
+    def hint(self, hint_: str) -> None:
+        """
+        A setter method to change the hint that is displayed while the input is empty.
+        The value of the 'hint_' argument must be of string type.
+
+        :param hint_: The new hint.
+        :return: None
+        """
+
+        if isinstance(hint_, str):
+            self._hint = hint_
+            self._text_dirty = True
         else:
             raise TypeError
 
@@ -196,34 +189,22 @@ class HintPrompt(BaseCprompt):
         :return: None
         """
 
-        temp: str = self._text.replace(" ", " - ")
-
-        output: list = []
-        for word in temp.split():
-            if word in self._formatted.keys():
-                output.append(self._formatted[word])
-            else:
-                if word == '-':
-                    output.append(" ")
-                else:
-                    output.append(word)
-
-        sys.stdout.write(ERASE_ENTIRE_LINE)
-        sys.stdout.write(move_cursor_to_column(col=0))
-
         if be_returned:
-            return ''.join(output)
+            return self._format()
 
-        if len(self.text) == 0:
-            sys.stdout.write(self.message + self.hint + move_cursor_to_column(len(self.message)+1))
-            sys.stdout.flush()
+        if len(self._buffer) == 0:
+            self._render(self.message, self.hint, cursor=0)
         else:
-            sys.stdout.write(
-                self.message + ''.join(output) + move_cursor_to_column(col=self._cursor+len(self.message)+1)
-            )
-            sys.stdout.flush()
+            self._render(self.message)
 
-    def prompt(self, conditions: tuple=None, pure_return: bool=True) -> str:
+    def prompt(
+        self,
+        conditions: tuple=None,
+        pure_return: bool=True,
+        *,
+        timeout: float=None,
+        idle_timeout: float=None,
+    ) -> str:
         """
         The task of this method is to get input from the user.
         This method reads the keyboard with the help of a set of methods of this class
@@ -234,7 +215,9 @@ class HintPrompt(BaseCprompt):
 
         :param conditions: Conditions to be checked at the time of entry in the format of a tuple.
         :param pure_return: Is the actual value of the text returned or formatted?
-        :return: str
+        :param timeout: The maximum duration of the prompt in seconds (None means no limit).
+        :param idle_timeout: The maximum time between two keys in seconds (None means no limit).
+        :return: str (PromptTimeoutError, carrying the entered text, is raised when a timeout passes)
         """
 
         if conditions is None:
@@ -243,66 +226,40 @@ class HintPrompt(BaseCprompt):
             if not isinstance(conditions, tuple):
                 raise TypeError
 
-        self._display()
-
-        while True:
-            key: str = readkey()
-            self._last_key: str = key
-            exit_status: bool = False
-
-            if conditions:
-                for func in conditions:
-                    try:
-                        self._returned_value = func(self)
-                    except SystemExit:
-                        exit_status = True
-                    except TypeError:
-                        raise Exception
-
-            if key not in self.ignored_keys:
-                match key:
-                    case 'ENTER':
-                        self._display()
-                        sys.stdout.write(NEW_LINE)
-                        break
-
-                    case 'BACKSPACE':
-                        self.remove()
-
-                    case 'RIGHT':
-                        self.move_cursor_right()
-
-                    case 'LEFT':
-                        self.move_cursor_left()
-
-                    case 'SPACE':
-                        self._write(" ")
-
-                    case _:
-                        special_keys: tuple = (
-                            'UP',
-                            'DOWN',
-                            'SHIFT+RIGHT',
-                            'SHIFT+LEFT',
-                            'ESCAPE',
-                            'TAB',
-                            'INSERT',
-                            'DELETE',
-                            'PAGE_UP',
-                            'PAGE_DOWN',
-                            'HOME',
-                            'END',
-                        )
-                        if key is not None:
-                            if not key.startswith('CTRL') and key not in special_keys:
-                                self._write(key)
-
-            self._display()
-
-            if exit_status:
-                sys.stdout.write(NEW_LINE)
-                sys.stdout.flush()
-                break
+        self._run(conditions, timeout, idle_timeout)
+
+        if pure_return:
+            return self._text
+
+        return self._display(be_returned=True)
+
+    async def prompt_async(
+        self,
+        conditions: tuple=None,
+        pure_return: bool=True,
+        *,
+        timeout: float=None,
+        idle_timeout: float=None,
+    ) -> str:
+        """
+        The task of this method is to get input from the user inside a running asyncio event loop.
+        It works like the prompt method, but the keyboard is read without blocking the event loop,
+        so other tasks keep running while the user types. Conditions can be coroutine functions.
+
+        :param conditions: Conditions to be checked at the time of entry in the format of a tuple.
+        :param pure_return: Is the actual value of the text returned or formatted?
+        :param timeout: The maximum duration of the prompt in seconds (None means no limit).
+        :param idle_timeout: The maximum time between two keys in seconds (None means no limit).
+        :return: str (PromptTimeoutError, carrying the entered text, is raised when a timeout passes)
+        """
+
+        if conditions is None:
+            conditions = self.conditions
+        else:
+            if not isinstance(conditions, tuple):
+                raise TypeError
+
+        await self._run_async(conditions, timeout, idle_timeout)
 
         if pure_return:
             return self._text
@@ -315,6 +272,8 @@ class CommandPrompt(BaseCprompt):
 
     """
 
+    STRATEGIES: tuple = ('save', 'alternate', 'query')
+
     def __init__(
         self,
         message: str = "",
@@ -322,11 +281,14 @@ class CommandPrompt(BaseCprompt):
         *,
         limit: int = None,
         conditions: tuple = None,
+        buffer: type[TextBuffer] = None,
+        strategy: str = 'save',
     ):
         super().__init__(
             message,
             limit=limit,
             conditions=conditions,
+            buffer=buffer,
         )
 
         if isinstance(ckey, str):
@@ -337,43 +299,88 @@ class CommandPrompt(BaseCprompt):
         else:
             raise TypeError
 
-        self.__pre_row, self.__pre_col = get_cursor_position()
+        if strategy in self.STRATEGIES:
+            self.strategy = strategy
+        else:
+            raise ValueError(
+                f'The strategy must be one of {self.STRATEGIES}, but received "{strategy}".'
+            )
 
-    def _display(self, be_returned: bool=False) -> None|str:
+        self.__pre_row, self.__pre_col = None, None
+
+    def _begin(self) -> None:
         """
-        The task of this method is to display the user's input live and instantly.
+        The task of this method is to remember the location of the cursor before the command prompt is drawn.
+        With the 'save' strategy the terminal saves the cursor itself, with the 'alternate' strategy
+        the prompt is drawn in the alternate screen buffer and only the 'query' strategy asks the terminal
+        for the position (unless _begin_async already did).
 
-        :param be_returned: Will the formatted user input be returned?
         :return: None
         """
 
-        temp: str = self._text.replace(" ", " - ")
+        match self.strategy:
+            case 'save':
+                self._output.write(SAVE_CURSOR_POSITION)
 
-        output: list = []
-        for word in temp.split():
-            if word in self._formatted.keys():
-                output.append(self._formatted[word])
-            else:
-                if word == '-':
-                    output.append(" ")
-                else:
-                    output.append(word)
+            case 'alternate':
+                self._output.write(ENABLE_ALTERNATIVE_BUFFER)
+
+            case 'query' if self.__pre_row is None:
+                self.__pre_row, self.__pre_col = get_cursor_position()
+
+    async def _begin_async(self) -> None:
+        """
+        The task of this method is to ask the terminal for the position of the cursor with the 'query'
+        strategy without blocking the event loop, so _begin does not wait for the reply.
+
+        :return: None
+        """
+
+        if self.strategy == 'query':
+            self.__pre_row, self.__pre_col = await get_cursor_position_async()
+
+    def _end(self) -> None:
+        """
+        The task of this method is to return the cursor to its location before the command prompt.
+
+        :return: None
+        """
+
+        match self.strategy:
+            case 'save':
+                self._output.write(RESTORE_CURSOR)
 
-        _, termrow = os.get_terminal_size()
+            case 'alternate':
+                self._output.write(DISABLE_ALTERNATIVE_BUFFER)
 
-        sys.stdout.write(move_cursor(termrow, 0))
-        sys.stdout.write(ERASE_ENTIRE_LINE)
-        sys.stdout.write(move_cursor_to_column(col=0))
+            case 'query' if self.__pre_row is not None:
+                self._output.write(move_cursor(self.__pre_row, self.__pre_col))
+                self.__pre_row, self.__pre_col = None, None
+
+    def _display(self, be_returned: bool=False) -> None|str:
+        """
+        The task of this method is to display the user's input live and instantly.
+
+        :param be_returned: Will the formatted user input be returned?
+        :return: None
+        """
 
         if be_returned:
-            return ''.join(output)
+            return self._format()
 
-        sys.stdout.write(
-            self.message + ''.join(output) + move_cursor_to_column(col=self._cursor+len(self.message)+1)
-        )
-        sys.stdout.flush()
+        if self._renderer.is_reset:
+            self._output.write(move_cursor(self._terminal.lines, 0))
 
-    def prompt(self, conditions: tuple=None, pure_return: bool=True) -> str:
+        self._render(self.message)
+
+    def prompt(
+        self,
+        conditions: tuple=None,
+        pure_return: bool=True,
+        *,
+        timeout: float=None,
+        idle_timeout: float=None,
+    ) -> str:
         """
         The task of this method is to get input from the user.
         This method reads the keyboard with the help of a set of methods of this class
@@ -384,7 +391,9 @@ class CommandPrompt(BaseCprompt):
 
         :param conditions: Conditions to be checked at the time of entry in the format of a tuple.
         :param pure_return: Is the actual value of the text returned or formatted?
-        :return: str
+        :param timeout: The maximum duration of the prompt in seconds (None means no limit).
+        :param idle_timeout: The maximum time between two keys in seconds (None means no limit).
+        :return: str (PromptTimeoutError, carrying the entered text, is raised when a timeout passes)
         """
 
         if conditions is None:
@@ -393,73 +402,56 @@ class CommandPrompt(BaseCprompt):
             if not isinstance(conditions, tuple):
                 raise TypeError
 
-        self._display()
-
-        while True:
-            key: str = readkey()
-            self._last_key: str = key
-            exit_status: bool = False
-
-            if conditions:
-                for func in conditions:
-                    try:
-                        self._returned_value = func(self)
-                    except SystemExit:
-                        exit_status = True
-                    except TypeError:
-                        raise Exception
-
-            if key not in self.ignored_keys:
-                match key:
-                    case 'ENTER':
-                        sys.stdout.write(ERASE_ENTIRE_LINE)
-                        sys.stdout.write(move_cursor(self.__pre_row, self.__pre_col))
-                        sys.stdout.flush()
-                        break
-
-                    case 'BACKSPACE':
-                        self.remove()
-
-                    case 'RIGHT':
-                        self.move_cursor_right()
-
-                    case 'LEFT':
-                        self.move_cursor_left()
-
-                    case 'SPACE':
-                        self._write(" ")
-
-                    case _:
-                        special_keys: tuple = (
-                            'UP',
-                            'DOWN',
-                            'SHIFT+RIGHT',
-                            'SHIFT+LEFT',
-                            'ESCAPE',
-                            'TAB',
-                            'INSERT',
-                            'DELETE',
-                            'PAGE_UP',
-                            'PAGE_DOWN',
-                            'HOME',
-                            'END',
-                        )
-                        if key is not None:
-                            if not key.startswith('CTRL') and key not in special_keys:
-                                self._write(key)
-
-            self._display()
-
-            if exit_status:
-                sys.stdout.write(NEW_LINE)
-                sys.stdout.flush()
-                break
+        self._run(conditions, timeout, idle_timeout)
 
         if pure_return:
             return self._text
 
         return self._display(be_returned=True)
 
+    async def prompt_async(
+        self,
+        conditions: tuple=None,
+        pure_return: bool=True,
+        *,
+        timeout: float=None,
+        idle_timeout: float=None,
+    ) -> str:
+        """
+        The task of this method is to get input from the user inside a running asyncio event loop.
+        It works like the prompt method, but the keyboard is read without blocking the event loop,
+        so other tasks keep running while the user types. Conditions can be coroutine functions.
+
+        :param conditions: Conditions to be checked at the time of entry in the format of a tuple.
+        :param pure_return: Is the actual value of the text returned or formatted?
+        :param timeout: The maximum duration of the prompt in seconds (None means no limit).
+        :param idle_timeout: The maximum time between two keys in seconds (None means no limit).
+        :return: str (PromptTimeoutError, carrying the entered text, is raised when a timeout passes)
+        """
+
+        if conditions is None:
+            conditions = self.conditions
+        else:
+            if not isinstance(conditions, tuple):
+                raise TypeError
+
+        await self._run_async(conditions, timeout, idle_timeout)
+
+        if pure_return:
+            return self._text
+
+        return self._display(be_returned=True)
+
+    def _accept(self) -> None:
+        """
+        The task of this method is to finish the command prompt when the user presses ENTER.
+        The line of the command prompt is erased and the cursor is returned to its previous location by _end.
+
+        :return: None
+        """
+
+        self._output.write(ERASE_ENTIRE_LINE)
+
     def show(self, prompt: BaseCprompt) -> str:
         """
         The task of this method is to prepare and execute the desired prompt
@@ -472,4 +464,24 @@ class CommandPrompt(BaseCprompt):
         prompt.ignored_keys.append(self.ckey)
 
         if prompt.last_key == self.ckey:
-            return self.prompt()
\ No newline at end of file
+            result: str = self.prompt()
+            prompt._renderer.reset()
+
+            return result
+
+    async def show_async(self, prompt: BaseCprompt) -> str:
+        """
+        The task of this method is to prepare and execute the desired prompt
+        in the case of an asynchronous condition for another prompt.
+
+        :param prompt: A BaseCprompt object.
+        :return: str
+        """
+
+        prompt.ignored_keys.append(self.ckey)
+
+        if prompt.last_key == self.ckey:
+            result: str = await self.prompt_async()
+            prompt._renderer.reset()
+
+            return result
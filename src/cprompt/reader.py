@@ -0,0 +1,308 @@
+"""
+ ██████╗██████╗ ██████╗  ██████╗ ███╗   ███╗██████╗ ████████╗
+██╔════╝██╔══██╗██╔══██╗██╔═══██╗████╗ ████║██╔══██╗╚══██╔══╝
+██║     ██████╔╝██████╔╝██║   ██║██╔████╔██║██████╔╝   ██║
+██║     ██╔═══╝ ██╔══██╗██║   ██║██║╚██╔╝██║██╔═══╝    ██║
+╚██████╗██║     ██║  ██║╚██████╔╝██║ ╚═╝ ██║██║        ██║
+ ╚═════╝╚═╝     ╚═╝  ╚═╝ ╚═════╝ ╚═╝     ╚═╝╚═╝        ╚═╝
+
+cprompt is a package for creating live and customized one-line prompts that can
+be used to manage and personalize input from the user in the terminal (bash) environment.
+
+cprompt Github repository: https://github.com/mimseyedi/cprompt
+
+This file is related to reading the raw input of the terminal at the byte level.
+Instead of reading one character per system call through the text layer of sys.stdin,
+the InputReader drains all the available bytes of the file descriptor with os.read,
+decodes them incrementally as UTF-8 and keeps the decoded characters until the key
+decoder consumes them. Typed-ahead input and escape sequences are therefore read with
+a single system call. New chunks are only joined to the buffer when the buffer is read,
+and find searches each new character once, so waiting for the end of a large bracketed paste
+costs time in proportion to the size of the paste.
+
+Other file descriptors (like the self-pipe of a terminal resize) can be watched together
+with the input, so a blocked wait wakes up with an event instead of a key.
+"""
+
+
+import os
+import codecs
+import select
+
+
+class InputReader:
+    """
+    A buffered reader over the file descriptor of the terminal.
+    """
+
+    CHUNK_SIZE: int = 4096
+
+    def __init__(self, fd: int):
+        self.fd: int = fd
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._buffer: str = ""
+        self._pos: int = 0
+        self._chunks: list = []
+        self._chunked: int = 0
+        self._scan: tuple = ("", 0)
+        self._watched: dict = {}
+        self._events: list = []
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def _read_available(self) -> None:
+        """
+        The task of this method is to read all the bytes that are available on the file descriptor
+        with one system call and append the decoded characters to the buffer.
+        An incomplete UTF-8 sequence at the end of the bytes is kept by the decoder until the rest arrives.
+
+        :return: None
+        """
+
+        data: bytes = os.read(self.fd, self.CHUNK_SIZE)
+
+        if not data:
+            raise EOFError('The input of the terminal is closed.')
+
+        chunk: str = self._decoder.decode(data)
+
+        if chunk:
+            self._chunks.append(chunk)
+            self._chunked += len(chunk)
+
+    def _join(self) -> None:
+        """
+        The task of this method is to join the chunks that were read since the last join to the buffer.
+
+        :return: None
+        """
+
+        if self._chunks:
+            self._buffer = ''.join([self._buffer[self._pos:], *self._chunks])
+            self._pos = 0
+            self._chunks.clear()
+            self._chunked = 0
+
+    def _wait(self, timeout: float|None, wakeup: bool=False) -> bool:
+        if not wakeup or not self._watched:
+            readable, _, _ = select.select([self.fd], [], [], timeout)
+            return bool(readable)
+
+        readable, _, _ = select.select([self.fd, *self._watched], [], [], timeout)
+
+        for fd in readable:
+            if fd != self.fd and fd not in self._events:
+                self._events.append(fd)
+
+        return self.fd in readable
+
+    def fill(self, timeout: float|None=None, wakeup: bool=False) -> bool:
+        """
+        The task of this method is to wait until the file descriptor is readable
+        and then read all the available bytes.
+
+        :param timeout: The maximum waiting time in seconds (None means waiting without a limit).
+        :param wakeup: Can a watched file descriptor end the wait? (See watch and next_event.)
+        :return: bool (True if new bytes were read)
+        """
+
+        if wakeup and self._events:
+            return False
+
+        if self._wait(timeout, wakeup):
+            self._read_available()
+            return True
+
+        return False
+
+    def watch(self, fd: int, event: str) -> None:
+        """
+        The task of this method is to watch another file descriptor while waiting for input.
+        When it becomes readable, a wait with wakeup ends and the event is queued.
+        The owner of the file descriptor must drain it after handling the event.
+        A file descriptor can be watched more than once and is removed after the same number of unwatch calls.
+
+        :param fd: The file descriptor to be watched.
+        :param event: The name of the event (for example 'RESIZE').
+        :return: None
+        """
+
+        if fd in self._watched:
+            self._watched[fd][1] += 1
+        else:
+            self._watched[fd] = [event, 1]
+
+    def unwatch(self, fd: int) -> None:
+        """
+        The task of this method is to stop watching a file descriptor that was added with watch.
+        When the file descriptor is removed, its queued event is dropped as well, so it cannot
+        reach a later prompt that does not watch it.
+
+        :param fd: The watched file descriptor.
+        :return: None
+        """
+
+        if fd in self._watched:
+            self._watched[fd][1] -= 1
+
+            if not self._watched[fd][1]:
+                del self._watched[fd]
+
+                if fd in self._events:
+                    self._events.remove(fd)
+
+    def next_event(self) -> str|None:
+        """
+        The task of this method is to return and remove the oldest queued event.
+
+        :return: str|None (None if no event is queued)
+        """
+
+        return self._watched[self._events.pop(0)][0] if self._events else None
+
+    def buffered(self) -> int:
+        """
+        The task of this method is to return the number of decoded characters
+        that are waiting in the buffer.
+
+        :return: int
+        """
+
+        return len(self._buffer) - self._pos + self._chunked
+
+    def pending(self) -> bool:
+        """
+        The task of this method is to check if any input is waiting, either in the buffer
+        or on the file descriptor, without blocking.
+
+        :return: bool
+        """
+
+        return self.buffered() > 0 or self._wait(0)
+
+    def peek(self) -> str:
+        """
+        The task of this method is to return the buffered characters without consuming them.
+
+        :return: str
+        """
+
+        self._join()
+
+        return self._buffer[self._pos:]
+
+    def find(self, marker: str) -> int:
+        """
+        The task of this method is to find a marker in the buffered characters without joining them.
+        If the marker is not found, the position where the search stopped is remembered, so the next
+        search for the same marker only reads the characters that arrived since then.
+
+        :param marker: The searched string.
+        :return: int (the index of the marker in the buffered characters, or -1)
+        """
+
+        start: int = self._scan[1] if self._scan[0] == marker else 0
+        index: int = self._tail(start).find(marker)
+
+        if index != -1:
+            self._scan = ("", 0)
+            return start + index
+
+        self._scan = (marker, max(self.buffered() - len(marker) + 1, start))
+
+        return -1
+
+    def _tail(self, start: int) -> str:
+        """
+        The task of this method is to return the buffered characters from an index.
+        Only the chunks that reach the index are read.
+
+        :param start: An index of the buffered characters.
+        :return: str
+        """
+
+        parts: list = []
+        remaining: int = self.buffered() - start
+
+        for chunk in reversed(self._chunks):
+            if remaining <= 0:
+                break
+
+            parts.append(chunk if remaining >= len(chunk) else chunk[-remaining:])
+            remaining -= len(chunk)
+
+        if remaining > 0:
+            parts.append(self._buffer[len(self._buffer) - remaining:])
+
+        return ''.join(reversed(parts))
+
+    def consume(self, count: int) -> str:
+        """
+        The task of this method is to remove characters from the front of the buffer.
+
+        :param count: The number of characters to be consumed.
+        :return: str (the consumed characters)
+        """
+
+        self._join()
+        self._scan = ("", 0)
+
+        consumed: str = self._buffer[self._pos:self._pos + count]
+        self._pos += len(consumed)
+
+        return consumed
+
+    def unread(self, text: str) -> None:
+        """
+        The task of this method is to push characters back to the front of the buffer
+        so that they are read again before any new input.
+
+        :param text: The characters to be pushed back.
+        :return: None
+        """
+
+        self._join()
+        self._scan = ("", 0)
+        self._buffer = text + self._buffer[self._pos:]
+        self._pos = 0
+
+    def getchar(self, timeout: float|None=None) -> str|None:
+        """
+        The task of this method is to return the next character of the input.
+        If the buffer is empty, the file descriptor is read once for all the available bytes.
+
+        :param timeout: The maximum waiting time in seconds (None means waiting without a limit).
+        :return: str|None (None if no character arrived before the timeout)
+        """
+
+        while not self.buffered():
+            if not self.fill(timeout) and timeout is not None:
+                return None
+
+        if self._pos == len(self._buffer):
+            self._join()
+
+        char: str = self._buffer[self._pos]
+        self._pos += 1
+        self._scan = ("", 0)
+
+        return char
+
+
+_readers: dict = {}
+
+
+def get_reader(fd: int) -> InputReader:
+    """
+    The task of this function is to return the shared reader of a file descriptor.
+    Characters that are read ahead stay in this reader between prompts, so no input is lost.
+
+    :param fd: The file descriptor of the terminal.
+    :return: InputReader
+    """
+
+    if fd not in _readers:
+        _readers[fd] = InputReader(fd)
+
+    return _readers[fd]
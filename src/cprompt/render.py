@@ -0,0 +1,301 @@
+"""
+ ██████╗██████╗ ██████╗  ██████╗ ███╗   ███╗██████╗ ████████╗
+██╔════╝██╔══██╗██╔══██╗██╔═══██╗████╗ ████║██╔══██╗╚══██╔══╝
+██║     ██████╔╝██████╔╝██║   ██║██╔████╔██║██████╔╝   ██║
+██║     ██╔═══╝ ██╔══██╗██║   ██║██║╚██╔╝██║██╔═══╝    ██║
+╚██████╗██║     ██║  ██║╚██████╔╝██║ ╚═╝ ██║██║        ██║
+ ╚═════╝╚═╝     ╚═╝  ╚═╝ ╚═════╝ ╚═╝     ╚═╝╚═╝        ╚═╝
+
+cprompt is a package for creating live and customized one-line prompts that can
+be used to manage and personalize input from the user in the terminal (bash) environment.
+
+cprompt Github repository: https://github.com/mimseyedi/cprompt
+
+This file is related to drawing the prompt line on the terminal screen.
+The LineRenderer remembers the last frame it has drawn as a list of terminal cells
+and compares it with the next frame, so it only emits the ANSI escape codes that are needed
+to reach the next frame: a cursor move, an insert/delete-character sequence or a rewrite
+of the changed tail of the line. When the caller knows which span of the line has changed,
+the renderer patches only that span and does not compare or even build the rest of the line. Each cell is a grapheme cluster that carries its display width,
+so wide characters and emoji sequences take two columns and combining marks are drawn together
+with the character before them.
+"""
+
+
+from operator import itemgetter
+from itertools import groupby
+from ansi import (
+    ESC,
+    CSI,
+    RESET,
+    ANSI_REGEX,
+    ERASE_ENTIRE_LINE,
+    ERASE_FROM_CURSOR_TO_END_OF_LINE,
+    CARRIAGE_RETURN,
+    BACKSPACE,
+    move_cursor_to_column,
+)
+from output import Output
+from prefix import PrefixSums
+from width import cluster_width
+from grapheme import split_graphemes
+
+
+def build_cells(segments: list[tuple[str, str]]) -> list[tuple[str, str, int]]:
+    """
+    The task of this function is to split styled segments into terminal cells.
+    Each cell is a grapheme cluster: a tuple of a style, the text of the cell and its width in columns.
+    A zero-width cluster (like a combining mark at the start of a segment) is added to the cell before it.
+
+    :param segments: The styled segments (see parse_segments).
+    :return: list[tuple[str, str, int]]
+    """
+
+    cells: list = []
+
+    for style, text in segments:
+        if text.isascii() and text.isprintable():
+            cells.extend((style, char, 1) for char in text)
+            continue
+
+        for cluster in split_graphemes(text):
+            width: int = cluster_width(cluster)
+
+            if width == 0 and cells:
+                previous_style, previous_text, previous_width = cells[-1]
+                cells[-1] = (previous_style, previous_text + cluster, previous_width)
+            else:
+                cells.append((style, cluster, width))
+
+    return cells
+
+
+def parse_segments(string: str, style: str="") -> list[tuple[str, str]]:
+    """
+    The task of this function is to split a string containing ANSI codes into styled segments.
+    Each segment is a tuple of the active graphics (SGR) codes and the text they apply to.
+    A reset code clears the active style, and ANSI codes other than graphics codes are dropped.
+
+    :param string: A string containing ANSI codes.
+    :param style: The style that is active at the beginning of the string.
+    :return: list[tuple[str, str]]
+    """
+
+    segments: list = []
+    position: int = 0
+
+    for match in ANSI_REGEX.finditer(string):
+        if match.start() > position:
+            segments.append((style, string[position:match.start()]))
+
+        code: str = match.group()
+
+        if code.endswith('m'):
+            style = "" if code in (RESET, ESC + CSI + 'm') else style + code
+
+        position = match.end()
+
+    if position < len(string):
+        segments.append((style, string[position:]))
+
+    return segments
+
+
+class LineRenderer:
+    """
+    A renderer that draws one line of the terminal screen differentially.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        The task of this method is to forget the last frame,
+        so that the next frame is drawn completely.
+
+        :return: None
+        """
+
+        self._cells: list|None = None
+        self._widths: PrefixSums = PrefixSums()
+        self._column: int = 0
+
+    @property
+    def is_reset(self) -> bool:
+        """
+        A getter method to check if the next frame is drawn completely.
+
+        :return: bool
+        """
+
+        return self._cells is None
+
+    @property
+    def width(self) -> int:
+        """
+        A getter method to get the width of the last frame in columns.
+
+        :return: int
+        """
+
+        return self._widths.total
+
+    def _move(self, column: int, output: Output) -> None:
+        if column == self._column:
+            return
+
+        if column == self._column - 1:
+            output.write(BACKSPACE)
+        else:
+            output.write(move_cursor_to_column(column + 1))
+
+        self._column = column
+
+    def _write(self, cells: list, output: Output) -> None:
+        style: str = ""
+
+        for cell_style, run in groupby(cells, key=itemgetter(0)):
+            if cell_style != style:
+                output.write(RESET + cell_style if style else cell_style)
+                style = cell_style
+
+            output.write(''.join(map(itemgetter(1), run)))
+
+        if style:
+            output.write(RESET)
+
+        self._column += sum(map(itemgetter(2), cells))
+
+    def render(self, segments: list[tuple[str, str]], cursor: int, output: Output) -> None:
+        """
+        The task of this method is to write the ANSI codes that change the last frame into the new frame.
+        The codes are added to the output backend and are written when the frame is flushed.
+
+        :param segments: The styled segments of the new frame (see parse_segments).
+        :param cursor: The column of the cursor in the new frame (starting from 0, in terminal columns).
+        :param output: The output backend of the terminal.
+        :return: None
+        """
+
+        cells: list = build_cells(segments)
+        old: list|None = self._cells
+
+        if old is None:
+            self._column = 0
+            output.write(CARRIAGE_RETURN + ERASE_ENTIRE_LINE)
+            self._write(cells, output)
+
+        elif old != cells:
+            limit: int = min(len(old), len(cells))
+            prefix: int = 0
+
+            while prefix < limit and old[prefix] == cells[prefix]:
+                prefix += 1
+
+            suffix: int = 0
+
+            while suffix < limit - prefix and old[-1 - suffix] == cells[-1 - suffix]:
+                suffix += 1
+
+            # Cells without width can only lead the line, so they are rewritten together with the change.
+            while prefix and not cells[prefix - 1][2]:
+                prefix -= 1
+
+            inserted: list = cells[prefix:len(cells) - suffix]
+            deleted: list = old[prefix:len(old) - suffix]
+            inserted_width: int = sum(map(itemgetter(2), inserted))
+            deleted_width: int = sum(map(itemgetter(2), deleted))
+
+            self._move(sum(map(itemgetter(2), cells[:prefix])), output)
+
+            # A count of zero is taken as one by the terminal, so the sequences are only used for a width.
+            if suffix and not deleted and inserted_width:
+                output.write(ESC + CSI + str(inserted_width) + '@')
+                self._write(inserted, output)
+
+            elif suffix and not inserted and deleted_width:
+                output.write(ESC + CSI + str(deleted_width) + 'P')
+
+            else:
+                self._write(cells[prefix:], output)
+
+                if sum(map(itemgetter(2), old)) > self._column:
+                    output.write(ERASE_FROM_CURSOR_TO_END_OF_LINE)
+
+        if old != cells:
+            self._widths.reset(map(itemgetter(2), cells))
+
+        self._cells = cells
+        self._move(cursor, output)
+
+    def patch(self, column: int, width: int, segments: list[tuple[str, str]], cursor: int, output: Output) -> bool:
+        """
+        The task of this method is to draw a new frame that differs from the last frame only in one span,
+        without looking at the rest of the line. The cells of the last frame that start at a column and
+        take a number of columns are replaced with the cells of the segments, and the cells after them
+        are kept (they are moved with an insert/delete-character sequence if the width changes).
+        If the span does not match the cells of the last frame, nothing is drawn and False is returned,
+        so that the caller can draw the whole frame with the render method.
+
+        :param column: The column where the changed span starts (in the last and in the new frame).
+        :param width: The width of the changed span in the last frame.
+        :param segments: The styled segments of the span in the new frame (see parse_segments).
+        :param cursor: The column of the cursor in the new frame (starting from 0, in terminal columns).
+        :param output: The output backend of the terminal.
+        :return: bool
+        """
+
+        if self._cells is None:
+            return False
+
+        cells: list = build_cells(segments)
+
+        # Only a cell at the start of a line can have no width, and such a cell makes the span ambiguous.
+        if cells and not cells[0][2] or self._cells and not self._cells[0][2]:
+            return False
+
+        first: int = self._widths.find(column)
+        last: int = self._widths.find(column + width)
+
+        if self._widths.prefix(first) != column or self._widths.prefix(last) != column + width:
+            return False
+
+        old: list = self._cells[first:last]
+        limit: int = min(len(old), len(cells))
+        prefix: int = 0
+
+        while prefix < limit and old[prefix] == cells[prefix]:
+            prefix += 1
+
+        suffix: int = 0
+
+        while suffix < limit - prefix and old[-1 - suffix] == cells[-1 - suffix]:
+            suffix += 1
+
+        if prefix + suffix < len(old) or prefix + suffix < len(cells):
+            inserted: list = cells[prefix:len(cells) - suffix]
+            deleted_width: int = sum(map(itemgetter(2), old[prefix:len(old) - suffix]))
+            inserted_width: int = sum(map(itemgetter(2), inserted))
+
+            self._move(column + sum(map(itemgetter(2), cells[:prefix])), output)
+
+            if last == len(self._cells) and not suffix:
+                self._write(inserted, output)
+
+                if deleted_width > inserted_width:
+                    output.write(ERASE_FROM_CURSOR_TO_END_OF_LINE)
+            else:
+                if inserted_width > deleted_width:
+                    output.write(ESC + CSI + str(inserted_width - deleted_width) + '@')
+                elif inserted_width < deleted_width:
+                    output.write(ESC + CSI + str(deleted_width - inserted_width) + 'P')
+
+                self._write(inserted, output)
+
+            self._cells[first:last] = cells
+            self._widths.splice(first, last, list(map(itemgetter(2), cells)))
+
+        self._move(cursor, output)
+
+        return True
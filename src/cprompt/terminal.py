@@ -0,0 +1,217 @@
+"""
+ ██████╗██████╗ ██████╗  ██████╗ ███╗   ███╗██████╗ ████████╗
+██╔════╝██╔══██╗██╔══██╗██╔═══██╗████╗ ████║██╔══██╗╚══██╔══╝
+██║     ██████╔╝██████╔╝██║   ██║██╔████╔██║██████╔╝   ██║
+██║     ██╔═══╝ ██╔══██╗██║   ██║██║╚██╔╝██║██╔═══╝    ██║
+╚██████╗██║     ██║  ██║╚██████╔╝██║ ╚═╝ ██║██║        ██║
+ ╚═════╝╚═╝     ╚═╝  ╚═╝ ╚═════╝ ╚═╝     ╚═╝╚═╝        ╚═╝
+
+cprompt is a package for creating live and customized one-line prompts that can
+be used to manage and personalize input from the user in the terminal (bash) environment.
+
+cprompt Github repository: https://github.com/mimseyedi/cprompt
+
+
+This file is related to the geometry (the number of columns and lines) of the terminal screen.
+While a prompt is running, the size of the terminal is queried once and kept, so the render path
+does not need an ioctl system call. When the terminal is resized, the SIGWINCH handler only marks
+the size as stale and writes a byte to a self-pipe; the input reader watches the read end of this
+pipe, so a waiting prompt wakes up with a 'RESIZE' event and refreshes the size outside of the
+signal handler. The handler is only installed while a prompt is subscribed to the resizes.
+"""
+
+
+import os
+import signal
+import threading
+from typing import Callable
+
+
+class Terminal:
+    """
+    The cached geometry of a terminal and the listeners that are notified when it changes.
+    """
+
+    def __init__(self, fd: int):
+        self.fd: int = fd
+        self._size: os.terminal_size|None = None
+        self._stale: bool = False
+        self._listeners: list = []
+        self._wakeup_read, self._wakeup_write = os.pipe()
+
+        os.set_blocking(self._wakeup_read, False)
+        os.set_blocking(self._wakeup_write, False)
+
+    def fileno(self) -> int:
+        return self.fd
+
+    @property
+    def wakeup_fd(self) -> int:
+        """
+        A getter method to get the file descriptor that becomes readable when the terminal is resized.
+
+        :return: int
+        """
+
+        return self._wakeup_read
+
+    @property
+    def size(self) -> os.terminal_size:
+        """
+        A getter method to get the size of the terminal.
+        While the SIGWINCH handler is installed, the terminal is only queried for the first time and after a resize.
+
+        :return: os.terminal_size
+        """
+
+        if self._size is None or self._stale or not _installed:
+            self._stale = False
+            self._size = os.get_terminal_size(self.fd)
+
+        return self._size
+
+    @property
+    def columns(self) -> int:
+        """
+        A getter method to get the width of the terminal screen.
+
+        :return: int
+        """
+
+        return self.size.columns
+
+    @property
+    def lines(self) -> int:
+        """
+        A getter method to get the height of the terminal screen.
+
+        :return: int
+        """
+
+        return self.size.lines
+
+    def subscribe(self, listener: Callable) -> None:
+        """
+        The task of this method is to add a listener that is called with the new size after a resize.
+
+        :param listener: A callable that receives an os.terminal_size.
+        :return: None
+        """
+
+        self._listeners.append(listener)
+        _add_subscriber()
+
+    def unsubscribe(self, listener: Callable) -> None:
+        """
+        The task of this method is to remove a listener that was added with subscribe.
+
+        :param listener: The listener to be removed.
+        :return: None
+        """
+
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+            _remove_subscriber()
+
+    def _signal(self) -> None:
+        """
+        The task of this method is to mark the size as stale and wake up the waiting reader.
+        It is called from the SIGWINCH handler, so it only sets a flag and writes to the self-pipe.
+
+        :return: None
+        """
+
+        self._stale = True
+
+        try:
+            os.write(self._wakeup_write, b'\0')
+        except BlockingIOError:
+            pass
+
+    def refresh(self) -> os.terminal_size:
+        """
+        The task of this method is to handle a resize: the self-pipe is drained,
+        the size is queried again and all the listeners are notified once.
+
+        :return: os.terminal_size
+        """
+
+        try:
+            while os.read(self._wakeup_read, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        self._stale = True
+        size: os.terminal_size = self.size
+
+        for listener in self._listeners.copy():
+            listener(size)
+
+        return size
+
+
+_terminals: dict = {}
+_subscribers: int = 0
+_installed: bool = False
+_previous_handler = None
+
+
+def _handle_resize(signum, frame) -> None:
+    for terminal in _terminals.values():
+        terminal._signal()
+
+    if callable(_previous_handler):
+        _previous_handler(signum, frame)
+
+
+def _add_subscriber() -> None:
+    """
+    The task of this function is to count a new listener of any terminal.
+    The SIGWINCH handler is installed in the main thread when the first listener subscribes
+    (the previous handler is still called after it).
+
+    :return: None
+    """
+
+    global _subscribers, _installed, _previous_handler
+
+    _subscribers += 1
+
+    if not _installed and threading.current_thread() is threading.main_thread():
+        _previous_handler = signal.signal(signal.SIGWINCH, _handle_resize)
+        _installed = True
+
+
+def _remove_subscriber() -> None:
+    """
+    The task of this function is to count a listener that was removed.
+    When the last listener leaves, the previous SIGWINCH handler is restored
+    (a signal handler can only be changed in the main thread).
+
+    :return: None
+    """
+
+    global _subscribers, _installed, _previous_handler
+
+    _subscribers -= 1
+
+    if not _subscribers and _installed and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGWINCH, _previous_handler if _previous_handler is not None else signal.SIG_DFL)
+        _previous_handler = None
+        _installed = False
+
+
+def get_terminal(fd: int) -> Terminal:
+    """
+    The task of this function is to return the shared geometry of a terminal.
+    The SIGWINCH handler is only installed while a listener is subscribed (see Terminal.subscribe).
+
+    :param fd: The file descriptor of the terminal.
+    :return: Terminal
+    """
+
+    if fd not in _terminals:
+        _terminals[fd] = Terminal(fd)
+
+    return _terminals[fd]
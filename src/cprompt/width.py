@@ -0,0 +1,243 @@
+"""
+ ██████╗██████╗ ██████╗  ██████╗ ███╗   ███╗██████╗ ████████╗
+██╔════╝██╔══██╗██╔══██╗██╔═══██╗████╗ ████║██╔══██╗╚══██╔══╝
+██║     ██████╔╝██████╔╝██║   ██║██╔████╔██║██████╔╝   ██║
+██║     ██╔═══╝ ██╔══██╗██║   ██║██║╚██╔╝██║██╔═══╝    ██║
+╚██████╗██║     ██║  ██║╚██████╔╝██║ ╚═╝ ██║██║        ██║
+ ╚═════╝╚═╝     ╚═╝  ╚═╝ ╚═════╝ ╚═╝     ╚═╝╚═╝        ╚═╝
+
+cprompt is a package for creating live and customized one-line prompts that can
+be used to manage and personalize input from the user in the terminal (bash) environment.
+
+cprompt Github repository: https://github.com/mimseyedi/cprompt
+
+This file is related to the display width of the user's input string on the terminal screen.
+East Asian wide and fullwidth characters take two columns, combining marks and format
+characters take no column and the other printable characters take one column.
+A grapheme cluster is measured as a whole: an emoji sequence (joined with zero-width joiners,
+with a skin tone modifier or with the emoji presentation selector) takes two columns, and
+the other clusters take the sum of the widths of their characters.
+The wide characters are looked up with a binary search over a compact table of codepoint ranges,
+and the WidthIndex keeps the widths of the input string in prefix sums that follow its edits,
+so the column of any index is found without measuring the text again.
+"""
+
+
+import unicodedata
+from bisect import bisect_right
+from functools import lru_cache
+from buffer import TextBuffer
+from prefix import PrefixSums
+from grapheme import GraphemeIndex, grapheme_property, split_graphemes, PICTOGRAPHIC
+
+
+# The ranges of East Asian wide (W) and fullwidth (F) characters (Unicode 14.0).
+# Unassigned codepoints between two ranges are included, since they are reserved for wide characters.
+_WIDE_RANGES: tuple = (
+    (0x01100, 0x0115F), (0x0231A, 0x0231B), (0x02329, 0x0232A), (0x023E9, 0x023EC),
+    (0x023F0, 0x023F0), (0x023F3, 0x023F3), (0x025FD, 0x025FE), (0x02614, 0x02615),
+    (0x02648, 0x02653), (0x0267F, 0x0267F), (0x02693, 0x02693), (0x026A1, 0x026A1),
+    (0x026AA, 0x026AB), (0x026BD, 0x026BE), (0x026C4, 0x026C5), (0x026CE, 0x026CE),
+    (0x026D4, 0x026D4), (0x026EA, 0x026EA), (0x026F2, 0x026F3), (0x026F5, 0x026F5),
+    (0x026FA, 0x026FA), (0x026FD, 0x026FD), (0x02705, 0x02705), (0x0270A, 0x0270B),
+    (0x02728, 0x02728), (0x0274C, 0x0274C), (0x0274E, 0x0274E), (0x02753, 0x02755),
+    (0x02757, 0x02757), (0x02795, 0x02797), (0x027B0, 0x027B0), (0x027BF, 0x027BF),
+    (0x02B1B, 0x02B1C), (0x02B50, 0x02B50), (0x02B55, 0x02B55), (0x02E80, 0x03029),
+    (0x0302E, 0x0303E), (0x03041, 0x03096), (0x0309B, 0x03247), (0x03250, 0x04DBF),
+    (0x04E00, 0x0A4C6), (0x0A960, 0x0A97C), (0x0AC00, 0x0D7A3), (0x0F900, 0x0FAD9),
+    (0x0FE10, 0x0FE19), (0x0FE30, 0x0FE6B), (0x0FF01, 0x0FF60), (0x0FFE0, 0x0FFE6),
+    (0x16FE0, 0x16FE3), (0x16FF0, 0x1B2FB), (0x1F004, 0x1F004), (0x1F0CF, 0x1F0CF),
+    (0x1F18E, 0x1F18E), (0x1F191, 0x1F19A), (0x1F200, 0x1F320), (0x1F32D, 0x1F335),
+    (0x1F337, 0x1F37C), (0x1F37E, 0x1F393), (0x1F3A0, 0x1F3CA), (0x1F3CF, 0x1F3D3),
+    (0x1F3E0, 0x1F3F0), (0x1F3F4, 0x1F3F4), (0x1F3F8, 0x1F43E), (0x1F440, 0x1F440),
+    (0x1F442, 0x1F4FC), (0x1F4FF, 0x1F53D), (0x1F54B, 0x1F54E), (0x1F550, 0x1F567),
+    (0x1F57A, 0x1F57A), (0x1F595, 0x1F596), (0x1F5A4, 0x1F5A4), (0x1F5FB, 0x1F64F),
+    (0x1F680, 0x1F6C5), (0x1F6CC, 0x1F6CC), (0x1F6D0, 0x1F6D2), (0x1F6D5, 0x1F6DF),
+    (0x1F6EB, 0x1F6EC), (0x1F6F4, 0x1F6FC), (0x1F7E0, 0x1F7F0), (0x1F90C, 0x1F93A),
+    (0x1F93C, 0x1F945), (0x1F947, 0x1F9FF), (0x1FA70, 0x1FAF6), (0x20000, 0x3134A),
+)
+
+_WIDE_STARTS: tuple = tuple(start for start, _ in _WIDE_RANGES)
+_WIDE_ENDS: tuple = tuple(end for _, end in _WIDE_RANGES)
+
+_ZERO_WIDTH_CATEGORIES: frozenset = frozenset(('Mn', 'Me', 'Cf'))
+
+
+@lru_cache(maxsize=4096)
+def char_width(char: str) -> int:
+    """
+    The task of this function is to return the number of columns that a character takes on the terminal screen.
+    The results are cached, so each distinct character is measured only once.
+
+    :param char: A string containing a single character.
+    :return: int (0, 1 or 2)
+    """
+
+    codepoint: int = ord(char)
+
+    if 0x20 <= codepoint < 0x7F:
+        return 1
+
+    if codepoint < 0x20 or 0x7F <= codepoint < 0xA0:
+        return 0
+
+    if unicodedata.category(char) in _ZERO_WIDTH_CATEGORIES or 0x1160 <= codepoint <= 0x11FF:
+        return 0
+
+    index: int = bisect_right(_WIDE_STARTS, codepoint) - 1
+
+    if index >= 0 and codepoint <= _WIDE_ENDS[index]:
+        return 2
+
+    return 1
+
+
+def cluster_width(cluster: str) -> int:
+    """
+    The task of this function is to return the number of columns that a grapheme cluster takes on the terminal screen.
+
+    :param cluster: A string containing a single grapheme cluster.
+    :return: int
+    """
+
+    if len(cluster) == 1:
+        return char_width(cluster)
+
+    if grapheme_property(cluster[0]) == PICTOGRAPHIC or '\uFE0F' in cluster:
+        return 2
+
+    return sum(map(char_width, cluster))
+
+
+def string_width(string: str) -> int:
+    """
+    The task of this function is to return the number of columns that a string takes on the terminal screen.
+    The string must not contain ANSI escape codes.
+
+    :param string: A string without ANSI escape codes.
+    :return: int
+    """
+
+    if string.isascii() and string.isprintable():
+        return len(string)
+
+    return sum(map(cluster_width, split_graphemes(string)))
+
+
+def fit_width(string: str, columns: int) -> str:
+    """
+    The task of this function is to return the longest beginning of a string that fits in a number of columns.
+    The string is only cut between grapheme clusters.
+
+    :param string: A string without ANSI escape codes.
+    :param columns: The number of available columns.
+    :return: str
+    """
+
+    if string.isascii() and string.isprintable():
+        return string[:max(columns, 0)]
+
+    used: int = 0
+    index: int = 0
+
+    for cluster in split_graphemes(string):
+        used += cluster_width(cluster)
+
+        if used > columns:
+            return string[:index]
+
+        index += len(cluster)
+
+    return string
+
+
+class WidthIndex:
+    """
+    The widths of the grapheme clusters of the user's input string and their prefix sums.
+    While every cluster is a single character that takes exactly one column (the common case),
+    a column is equal to its index and no prefix sums are needed. Otherwise, a column is looked up
+    in the prefix sums, which are updated for the clusters that an edit has replaced.
+    """
+
+    def __init__(self, clusters: GraphemeIndex):
+        self._clusters: GraphemeIndex = clusters
+        self._widths: PrefixSums = PrefixSums()
+        self._irregular: int = 0
+
+    def _regular(self) -> bool:
+        return not self._irregular and len(self._clusters) == self._clusters.length
+
+    def reset(self, text: str="") -> None:
+        """
+        The task of this method is to measure a whole text from the beginning.
+        The clusters must already be segmented from the same text.
+
+        :param text: The new user's input string.
+        :return: None
+        """
+
+        self._measure(text)
+
+    def edit(self, buffer: TextBuffer, start: int, end: int, length: int) -> None:
+        """
+        The task of this method is to update the widths after an edit of the user's input string.
+        Only the clusters that the edit has replaced are measured (the clusters must already be updated).
+
+        :param buffer: The text buffer after the edit.
+        :param start: The start index of the edit.
+        :param end: The end index of the replaced text (before the edit).
+        :param length: The length of the new text that is inserted at the start index.
+        :return: None
+        """
+
+        _, _, origin, lengths = self._clusters.changed
+
+        self._measure(buffer.slice(origin, origin + sum(lengths)))
+
+    def _measure(self, text: str) -> None:
+        """
+        The task of this method is to measure the clusters that the last edit of the clusters has replaced.
+
+        :param text: The text of the new clusters.
+        :return: None
+        """
+
+        first, last, _, lengths = self._clusters.changed
+        widths: list = []
+        position: int = 0
+
+        for cluster_length in lengths:
+            widths.append(cluster_width(text[position:position + cluster_length]))
+            position += cluster_length
+
+        removed: list = [self._widths[index] for index in range(first, min(last, len(self._widths)))]
+
+        self._irregular += len(widths) - widths.count(1) - len(removed) + removed.count(1)
+        self._widths.splice(first, last, widths)
+
+    def column(self, index: int) -> int:
+        """
+        The task of this method is to return the column of an index of the user's input string
+        (the total width of the clusters before the index).
+
+        :param index: An index between 0 and the length of the input string.
+        :return: int
+        """
+
+        if self._regular():
+            return index
+
+        return self._widths.prefix(self._clusters.cluster(index))
+
+    @property
+    def width(self) -> int:
+        """
+        A getter method to get the total width of the user's input string.
+
+        :return: int
+        """
+
+        if self._regular():
+            return self._clusters.length
+
+        return self._widths.total